@@ -0,0 +1,124 @@
+import json
+import os
+import re
+
+import pandas as pd
+
+# Layout of the compact exports, decodeCompact in src/components/nascar/utils/dataLoader.jsx reads it back:
+# {
+#   "format": "columnar-v1",
+#   "columns": [column names in record order],
+#   "encodings": {column: "dictionary" | "numeric_string"},  columns not listed are stored as they are
+#   "dictionaries": {column: [values]},  a dictionary column holds indexes into its list, or null
+#   "races": [{"rows": n, "constants": {column: value}, "columns": {column: [n values]}}],
+#   "order": [record index of every stored row]  only present when the records are not grouped by race
+# }
+# A numeric_string column holds numbers for values that were integer strings ("-12" -> -12), other
+# values like "Points Leader" stay strings. Columns with one value across a race are stored once in constants.
+COMPACT_FORMAT = 'columnar-v1'
+
+integer_string = re.compile(r'-?[1-9][0-9]*|0')
+
+
+def compact_path(output_path: str) -> str:
+    return f'{os.path.splitext(output_path)[0]}.compact.json'
+
+
+def write_compact(frame: pd.DataFrame, output_path: str, group_col: str = 'race_number') -> None:
+    """Writes frame next to its records export, e.g. standings_2024.json -> standings_2024.compact.json."""
+    with open(compact_path(output_path), 'w') as file:
+        json.dump(encode_compact(frame, group_col), file, separators=(',', ':'), allow_nan=False)
+    return
+
+
+def encode_compact(frame: pd.DataFrame, group_col: str = 'race_number') -> dict:
+    frame = frame.reset_index(drop=True)
+    columns = [str(col) for col in frame.columns]
+    encodings = {}
+    dictionaries = {}
+    values = {}
+    for col, series in zip(columns, frame.columns):
+        encodings[col], dictionaries[col], values[col] = encode_column(frame[series])
+
+    groups = frame.groupby(group_col, sort=True).indices if len(frame) else {}
+    order = [int(row) for rows in groups.values() for row in rows]
+    races = []
+    for rows in groups.values():
+        race = {'rows': len(rows), 'constants': {}, 'columns': {}}
+        for col in columns:
+            race_values = [values[col][row] for row in rows]
+            first = race_values[0]
+            if all(type(value) is type(first) and value == first for value in race_values):
+                race['constants'][col] = first
+            else:
+                race['columns'][col] = race_values
+        races.append(race)
+
+    payload = {
+        'format': COMPACT_FORMAT,
+        'columns': columns,
+        'encodings': {col: encoding for col, encoding in encodings.items() if encoding != 'plain'},
+        'dictionaries': {col: dictionary for col, dictionary in dictionaries.items() if dictionary is not None},
+        'races': races,
+    }
+    if order != list(range(len(frame))):
+        payload['order'] = order
+    return payload
+
+
+def encode_column(series: pd.Series) -> tuple:
+    """Returns (encoding, dictionary or None, JSON values) of a column, with the values to_json would write."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # to_json writes dates as epoch milliseconds
+        milliseconds = series.astype('int64') // 1_000_000
+        return 'plain', None, [None if missing else int(value) for value, missing in zip(milliseconds, series.isna())]
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return 'plain', None, series.tolist()
+    values = [to_json_value(value) for value in series.tolist()]
+    if pd.api.types.is_float_dtype(series):
+        return 'plain', None, values
+    present = [value for value in values if value is not None]
+    if not present or not all(isinstance(value, str) for value in present):
+        return 'plain', None, values
+    numeric = sum(1 for value in present if integer_string.fullmatch(value))
+    if numeric > len(present) - numeric:
+        return 'numeric_string', None, [int(value) if value is not None and integer_string.fullmatch(value) else value
+                                        for value in values]
+    ids = {}
+    for value in present:
+        ids.setdefault(value, len(ids))
+    return 'dictionary', list(ids), [None if value is None else ids[value] for value in values]
+
+
+def to_json_value(value):
+    """None for missing values, whole floats as ints (30.0 and 30 are the same number to the client)."""
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if hasattr(value, 'item'):
+        return to_json_value(value.item())
+    return value
+
+
+def decode_compact(payload: dict) -> list:
+    """The records a compact payload stands for, the Python counterpart of decodeCompact."""
+    records = []
+    for race in payload['races']:
+        for row in range(race['rows']):
+            record = {}
+            for col in payload['columns']:
+                value = race['constants'][col] if col in race['constants'] else race['columns'][col][row]
+                encoding = payload['encodings'].get(col)
+                if encoding == 'dictionary' and value is not None:
+                    value = payload['dictionaries'][col][value]
+                elif encoding == 'numeric_string' and isinstance(value, int):
+                    value = str(value)
+                record[col] = value
+            records.append(record)
+    if 'order' in payload:
+        ordered = [None] * len(records)
+        for position, record in zip(payload['order'], records):
+            ordered[position] = record
+        records = ordered
+    return records
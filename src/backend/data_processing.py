@@ -3,42 +3,117 @@ sys.path.append('.')
 
 from collections import defaultdict, OrderedDict
 
+import numpy as np
 import pandas as pd
 
 from owners_to_teams import owners_to_teams
 from penalties import penalties_driver, penalties_team
 
-from standings_calculation import standings_calculation
+from standings_calculation import dual_standings_calculation, StandingsLedgers
+
+standings_input_cols = ['driver_name',
+                        'wins',
+                        'race_pos',
+                        'stage_wins',
+                        'race_stage_points',
+                        'race_finish_points',
+                        'race_season_points',
+                        'race_number']
+car_standings_cols = ['season_points',
+                      'wins',
+                      'season_wins',
+                      'playoff_16_wins',
+                      'playoff_12_wins',
+                      'playoff_8_wins',
+                      'stage_wins',
+                      'race_stage_points',
+                      'race_finish_points',
+                      'race_playoff_points',
+                      'qualified_to_16',
+                      'qualified_to_12',
+                      'qualified_to_8',
+                      'qualified_to_final',
+                      'champion',
+                      'best_position',
+                      'n_best_positions']
+race_results_cols = ['driver_name',
+                     'car_number',
+                     'team_name',
+                     'manufacturer',
+                     'race_pos',
+                     'quali_pos',
+                     'stage_1_pos',
+                     'stage_2_pos',
+                     'laps_led',
+                     'status']
+race_details_cols = ['driver_name',
+                     'race_pos',
+                     'laps_led',
+                     'status',
+                     'season_points',
+                     'finish_position_points',
+                     'stage_points',
+                     'playoff_points']
 
 def fix_team_names(team_names: list) -> list:
     return [owners_to_teams[sponsor.split('(')[-1].strip(')')] for sponsor in team_names]
 
 
-def append_stage_data(stage_winners: list, race_results: pd.DataFrame):
-    positions = []
-    drivers = []
-    car_numbers = []
-    teams = []
-    manufacturers = []
-    for pos, winner_number in enumerate(stage_winners):
-        positions.append(pos + 1)
-        drivers.append(race_results[race_results['#'] == winner_number]['Driver'].values[0])
-        car_numbers.append(winner_number)
-        teams.append(race_results[race_results['#'] == winner_number]['Sponsor / Owner'].values[0])
-        manufacturers.append(race_results[race_results['#'] == winner_number]['Car'].values[0])
+class CarLookup:
+    """Entry list of one race indexed by car number, built once and shared by every stage of the race."""
+    def __init__(self, race_results: pd.DataFrame):
+        entries = race_results.drop_duplicates('#')
+        self.index = pd.Index(entries['#'])
+        self.drivers = entries['Driver'].to_numpy()
+        self.sponsors = entries['Sponsor / Owner'].to_numpy()
+        self.makes = entries['Car'].to_numpy()
+        self.teams = {}
+        return
+
+    def rows(self, car_numbers: list) -> np.ndarray:
+        rows = self.index.get_indexer(car_numbers)
+        if (rows < 0).any():
+            missing = [car for car, row in zip(car_numbers, rows) if row < 0]
+            raise IndexError(f"Cars {missing} are not in the race results")
+        return rows
+
+    def driver_names(self, car_numbers: list) -> list:
+        return self.drivers[self.rows(car_numbers)].tolist()
+
+    def team_names(self, rows: np.ndarray) -> list:
+        for sponsor in set(self.sponsors[rows].tolist()) - self.teams.keys():
+            self.teams[sponsor] = fix_team_names([sponsor])[0]
+        return [self.teams[sponsor] for sponsor in self.sponsors[rows].tolist()]
+
+
+def append_stage_data(stage_winners: list, race_results: pd.DataFrame, lookup: CarLookup | None = None):
+    if lookup is None:
+        lookup = CarLookup(race_results)
+    rows = lookup.rows(stage_winners)
     return {
         driver: {
         'position': position,
         'car_number': car_number,
         'team': team,
         'manufacturer': manufacturer} for (driver, position, car_number, team, manufacturer) in zip(
-            drivers,
-            positions,
-            car_numbers,
-            fix_team_names(teams),
-            manufacturers
+            lookup.drivers[rows].tolist(),
+            range(1, len(stage_winners) + 1),
+            stage_winners,
+            lookup.team_names(rows),
+            lookup.makes[rows].tolist(),
         )}
 
+def compose_stage_data(race_results: pd.DataFrame, stages: list) -> dict:
+    """{'Stage 1': ..., 'Stage 2': ...} from the winner lists of every stage, with one car lookup for the race."""
+    lookup = CarLookup(race_results)
+    return {f'Stage {stage}': append_stage_data(stage_winners, race_results, lookup)
+            for stage, stage_winners in enumerate(stages, start=1)}
+
+def compose_season_stage_data(races: dict) -> dict:
+    """compose_stage_data for a whole season, races maps a race number to its (race_results, stages)."""
+    return {race_number: compose_stage_data(race_results, stages)
+            for race_number, (race_results, stages) in races.items()}
+
 def sort_months(month_name):
     month_order = {
         "January": 1, "February": 2, "March": 3, "April": 4, "May": 5, "June": 6,
@@ -62,203 +137,104 @@ def compose_calendar_data(calendar_data: dict):
         ordered_calendar_data[month] = calendar_data_dict[month]
     return ordered_calendar_data
 
+def race_results_columns(raw_race_results, columns: list) -> dict:
+    """Column arrays of race results given as a DataFrame, a dict of arrays or a list of row dicts."""
+    if isinstance(raw_race_results, pd.DataFrame):
+        return {col: raw_race_results[col].to_numpy() for col in columns}
+    if isinstance(raw_race_results, dict):
+        return {col: np.asarray(raw_race_results[col]) for col in columns}
+    frame = pd.DataFrame.from_records(list(raw_race_results), columns=columns)
+    return {col: frame[col].to_numpy() for col in columns}
+
+def position_order(positions: np.ndarray, classified_only: bool = False) -> np.ndarray:
+    """Row order by position, optionally only the rows with a position (stage results keep 0 for unclassified)."""
+    rows = np.flatnonzero(positions > 0) if classified_only else np.arange(len(positions))
+    return rows[positions[rows].argsort(kind='quicksort')]
+
+def keyed_rows(keys: np.ndarray, order: np.ndarray, fields: dict) -> dict:
+    """{key: {field: value}} for the rows in order, fields maps output names to column arrays."""
+    names = list(fields)
+    values = zip(*[column[order].tolist() for column in fields.values()])
+    return {key: dict(zip(names, row)) for key, row in zip(keys[order].tolist(), values)}
+
 def compose_race_results(raw_race_results) -> dict:
-    race_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_race_results],
-                              'car_number': [res['car_number'] for res in raw_race_results],
-                              'team_name': [res['team_name'] for res in raw_race_results],
-                              'manufacturer': [res['manufacturer'] for res in raw_race_results],
-                              'race_pos': [res['race_pos'] for res in raw_race_results],
-                              'quali_pos': [res['quali_pos'] for res in raw_race_results],
-                              'laps_led': [res['laps_led'] for res in raw_race_results],
-                              'status': [res['status'] for res in raw_race_results]})
-    race_data = race_data.sort_values(by=['race_pos'], ascending=True)
-    results = {}
-    results['Race'] = {
-        drivers: {
-            'position': positions,
-            'car_number': car_numbers,
-            'team': teams,
-            'make': makes,
-            'laps_led': laps_leds,
-            'status': statuses,
-        } for (drivers, positions, car_numbers, teams, makes, laps_leds, statuses) in zip(
-                race_data['driver_name'].tolist(),
-                race_data['race_pos'].tolist(),
-                race_data['car_number'].tolist(),
-                race_data['team_name'].tolist(),
-                race_data['manufacturer'].tolist(),
-                race_data['laps_led'].tolist(),
-                race_data['status'].tolist(),
-        )}
-        
-
-    quali_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_race_results],
-                            'car_number': [res['car_number'] for res in raw_race_results],
-                            'team_name': [res['team_name'] for res in raw_race_results],
-                            'manufacturer': [res['manufacturer'] for res in raw_race_results],
-                            'start_position': [res['quali_pos'] for res in raw_race_results],})
-    quali_data = quali_data.sort_values(by=['start_position'], ascending=True)
-
-    results['Qualifying'] = {
-        drivers: {
-            'position': positions,
-            'car_number': car_numbers,
-            'team': teams,
-            'make': makes,
-        } for (drivers, positions, car_numbers, teams, makes) in zip(
-                quali_data['driver_name'].tolist(),
-                quali_data['start_position'].tolist(),
-                quali_data['car_number'].tolist(),
-                quali_data['team_name'].tolist(),
-                quali_data['manufacturer'].tolist(),
-        )}
+    data = race_results_columns(raw_race_results, race_results_cols)
+    entry = {'car_number': data['car_number'], 'team': data['team_name'], 'make': data['manufacturer']}
+    return {
+        'Race': keyed_rows(data['driver_name'], position_order(data['race_pos']), {
+            'position': data['race_pos'], **entry, 'laps_led': data['laps_led'], 'status': data['status']}),
+        'Qualifying': keyed_rows(data['driver_name'], position_order(data['quali_pos']), {
+            'position': data['quali_pos'], **entry}),
+        'Stage 1': keyed_rows(data['driver_name'], position_order(data['stage_1_pos'], classified_only=True), {
+            'position': data['stage_1_pos'], **entry}),
+        'Stage 2': keyed_rows(data['driver_name'], position_order(data['stage_2_pos'], classified_only=True), {
+            'position': data['stage_2_pos'], **entry}),
+    }
 
-    stage_1_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_race_results],
-                            'car_number': [res['car_number'] for res in raw_race_results],
-                            'team_name': [res['team_name'] for res in raw_race_results],
-                            'manufacturer': [res['manufacturer'] for res in raw_race_results],
-                            'stage_1_pos': [res['stage_1_pos'] for res in raw_race_results],})
-    stage_1_data = stage_1_data[stage_1_data['stage_1_pos'] > 0].sort_values(by=['stage_1_pos'], ascending=True)
-    results['Stage 1'] = {
-        drivers: {
-            'position': positions,
-            'car_number': car_numbers,
-            'team': teams,
-            'make': makes,
-        } for (drivers, positions, car_numbers, teams, makes) in zip(
-                stage_1_data['driver_name'].tolist(),
-                stage_1_data['stage_1_pos'].tolist(),
-                stage_1_data['car_number'].tolist(),
-                stage_1_data['team_name'].tolist(),
-                stage_1_data['manufacturer'].tolist(),
-        )}
+def compose_race_details(raw_results) -> dict:
+    data = race_results_columns(raw_results, race_details_cols)
+    status = data['status'].astype(object)
+    return {'Race Details': keyed_rows(data['driver_name'], position_order(data['race_pos']), {
+        'position': data['race_pos'],
+        'laps_led': data['laps_led'],
+        'status': np.where(status == 'running', 'finished', status),
+        'season_points': data['season_points'],
+        'finish_position_points': data['finish_position_points'],
+        'stage_points': data['stage_points'],
+        'playoff_points': data['playoff_points'],
+    })}
 
-    stage_2_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_race_results],
-                            'car_number': [res['car_number'] for res in raw_race_results],
-                            'team_name': [res['team_name'] for res in raw_race_results],
-                            'manufacturer': [res['manufacturer'] for res in raw_race_results],
-                            'stage_2_pos': [res['stage_2_pos'] for res in raw_race_results],})
-    stage_2_data = stage_2_data[stage_2_data['stage_2_pos'] > 0].sort_values(by=['stage_2_pos'], ascending=True)
-    results['Stage 2'] = {
-        drivers: {
-            'position': positions,
-            'car_number': car_numbers,
-            'team': teams,
-            'make': makes,
-        } for (drivers, positions, car_numbers, teams, makes) in zip(
-                stage_2_data['driver_name'].tolist(),
-                stage_2_data['stage_2_pos'].tolist(),
-                stage_2_data['car_number'].tolist(),
-                stage_2_data['team_name'].tolist(),
-                stage_2_data['manufacturer'].tolist(),
-        )}
-    return results
-
-def compose_race_details(raw_results: dict) -> dict:
-    race_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_results],
-                              'race_pos': [res['race_pos'] for res in raw_results],
-                              'laps_led': [res['laps_led'] for res in raw_results],
-                              'status': [res['status'] for res in raw_results],
-                              'season_points': [res['season_points'] for res in raw_results],
-                              'finish_position_points': [res['finish_position_points'] for res in raw_results],
-                              'stage_points': [res['stage_points'] for res in raw_results],
-                              'playoff_points': [res['playoff_points'] for res in raw_results]})
-    race_data = race_data.sort_values(by=['race_pos'], ascending=True)
-
-    results = {}
-    results['Race Details'] = {
-        drivers: {
-            'position': positions,
-            'laps_led': laps_leds,
-            'status': statuses,
-            'season_points': season_pointses,
-            'finish_position_points': finish_position_pointses,
-            'stage_points': stage_pointses,
-            'playoff_points': playoff_pointses,
-        } for (drivers,
-               positions,
-               laps_leds,
-               statuses,
-               season_pointses,
-               finish_position_pointses,
-               stage_pointses,
-               playoff_pointses) in zip(
-                        race_data['driver_name'].tolist(),
-                        race_data['race_pos'].tolist(),
-                        race_data['laps_led'].tolist(),
-                        [status if status != 'running' else 'finished' for status in race_data['status'].tolist()],
-                        race_data['season_points'].tolist(),
-                        race_data['finish_position_points'].tolist(),
-                        race_data['stage_points'].tolist(),
-                        race_data['playoff_points'].tolist(),
-        )}
-    return results
-
-def compose_season_standings_data(raw_data: list[dict], race_number: str, current_season: str) -> list[dict]:
-    raw_standings_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_data],
-                                  'wins': [res['wins'] for res in raw_data],
-                                  'stage_wins': [res['stage_wins'] for res in raw_data],
-                                  'race_stage_points': [res['race_stage_points'] for res in raw_data],
-                                  'race_finish_points': [res['race_finish_points'] for res in raw_data],
-                                  'race_season_points': [res['race_season_points'] for res in raw_data],
-                                  'initial_season_points': [res['race_season_points'] for res in raw_data],
-                                  'race_number': [res['race_number'] for res in raw_data],
-                                  'race_pos': [res['race_pos'] for res in raw_data],
-                                  })
-    standings_data = standings_calculation(raw_standings_data, int(race_number), int(current_season), penalties_driver)
+def compose_season_standings_data(raw_data: list[dict] | pd.DataFrame, race_number: str, current_season: str) -> list[dict]:
+    raw_standings_data = make_raw_standings_data(raw_data)
+    standings_data, car_standings_data = dual_standings_calculation(
+        raw_standings_data, int(race_number), int(current_season), penalties_driver, penalties_team)
     standings_data = standings_data.sort_values(
         by=['season_points', 'best_position', 'n_best_positions'],
         ascending=[False, True, False])
     standings_data['position'] = [x for x in range(1, len(standings_data) + 1)]
-
-    car_standings_data = standings_calculation(raw_standings_data, int(race_number), int(current_season), penalties_team)
-    car_standings_data = car_standings_data.sort_values(
-        by=['season_points', 'best_position', 'n_best_positions'],
-        ascending=[False, True, False])
-    car_standings_data['car_position'] = [x for x in range(1, len(car_standings_data) + 1)]
-    standings_cols = ['season_points',
-                    'wins',
-                    'season_wins',
-                    'playoff_16_wins',
-                    'playoff_12_wins',
-                    'playoff_8_wins',
-                    'stage_wins',
-                    'race_stage_points',
-                    'race_finish_points',
-                    'playoff_points',
-                    'qualified_to_16',
-                    'qualified_to_12',
-                    'qualified_to_8',
-                    'qualified_to_final',
-                    'champion',
-                    'best_position',
-                    'n_best_positions']
-    rename_cols = dict()
-    for col in standings_cols:
-        new_col_name = f"car_{col}"
-        rename_cols[col] = new_col_name
-        car_standings_data = car_standings_data.rename(columns=rename_cols)
-
-    # cols_to_use = ['driver_name', 'season_year', 'race_number', 'season_points', '']
-    standings_data = standings_data.merge(car_standings_data, on='driver_name')
+    standings_data = standings_data.merge(rank_car_standings(car_standings_data), on='driver_name')
     standings_data['season_year'] = current_season
     standings_data['race_number'] = race_number
     return standings_data
 
-def compose_playoff_standings_data(raw_data: dict, race_number: str, season_year: str) -> dict:
+def compose_playoff_standings_data(raw_data: list[dict] | pd.DataFrame, race_number: str, season_year: str) -> dict:
     race_number = int(race_number)
-    raw_standings_data = pd.DataFrame({'driver_name': [res['driver_name'] for res in raw_data],
-                                  'wins': [res['wins'] for res in raw_data],
-                                  'race_pos': [res['race_pos'] for res in raw_data],
-                                  'stage_wins': [res['stage_wins'] for res in raw_data],
-                                  'race_stage_points': [res['race_stage_points'] for res in raw_data],
-                                  'race_finish_points': [res['race_finish_points'] for res in raw_data],
-                                  'race_season_points': [res['race_season_points'] for res in raw_data],
-                                  'initial_season_points': [res['race_season_points'] for res in raw_data],
-                                  'race_number': [res['race_number'] for res in raw_data]})
-    
-    data = standings_calculation(raw_standings_data, race_number, int(season_year), penalties_driver)
+    raw_standings_data = make_raw_standings_data(raw_data)
+    data, car_standings_data = dual_standings_calculation(
+        raw_standings_data, race_number, int(season_year), penalties_driver, penalties_team)
+    return compose_playoff_snapshot(data, car_standings_data, race_number, season_year)
+
+def compose_playoff_standings_history(raw_data: list[dict] | pd.DataFrame,
+                                      last_race: str,
+                                      season_year: str,
+                                      replay_state: dict | None = None) -> pd.DataFrame:
+    """Standings after every race up to last_race. Engines kept in replay_state are extended, not replayed."""
+    raw_standings_data = make_raw_standings_data(raw_data)
+    if replay_state is None:
+        replay_state = {}
+    ledgers = replay_state.get('ledgers')
+    if ledgers is not None and ledgers.current_race <= int(last_race) and ledgers.extend(raw_standings_data):
+        snapshots = [ledgers.refresh_snapshots(snapshot) for snapshot in replay_state['snapshots']]
+    else:
+        ledgers = StandingsLedgers(raw_standings_data, int(season_year), penalties_driver, penalties_team)
+        snapshots = []
+    for _, snapshot in ledgers.replay(int(last_race)):
+        snapshots.append(snapshot)
+    replay_state.update(ledgers=ledgers, snapshots=snapshots)
+    season_standings = []
+    for race_number, (data, car_standings_data) in enumerate(snapshots, start=1):
+        season_standings.append(compose_playoff_snapshot(data, car_standings_data, race_number, season_year))
+    return pd.concat(season_standings)
 
+def make_raw_standings_data(raw_data: list[dict] | pd.DataFrame) -> pd.DataFrame:
+    if isinstance(raw_data, pd.DataFrame):
+        raw_standings_data = raw_data[standings_input_cols].reset_index(drop=True)
+    else:
+        raw_standings_data = pd.DataFrame({col: [res[col] for res in raw_data] for col in standings_input_cols})
+    raw_standings_data['initial_season_points'] = raw_standings_data['race_season_points']
+    return raw_standings_data
+
+def compose_playoff_snapshot(data: pd.DataFrame, car_standings_data: pd.DataFrame, race_number: int, season_year: str) -> pd.DataFrame:
     if race_number <= 26:
         standings_data = compose_bubble(data, 16, 'season_wins')
     elif race_number <= 29:
@@ -274,39 +250,20 @@ def compose_playoff_standings_data(raw_data: dict, race_number: str, season_year
             standings_data[standings_data['season_points'] == standings_data['season_points'].max()]['season_points'].tolist()[0]
         standings_data['point_gap_to_leader'] = standings_data['point_gap_to_leader'].fillna(0).astype(int).astype(str)
 
-    car_standings_data = standings_calculation(raw_standings_data, int(race_number), int(season_year), penalties_team)
-    car_standings_data = car_standings_data.sort_values(
-        by=['season_points', 'best_position', 'n_best_positions'],
-        ascending=[False, True, False])
-    car_standings_data['car_position'] = [x for x in range(1, len(car_standings_data) + 1)]
-    standings_cols = ['season_points',
-                    'wins',
-                    'season_wins',
-                    'playoff_16_wins',
-                    'playoff_12_wins',
-                    'playoff_8_wins',
-                    'stage_wins',
-                    'race_stage_points',
-                    'race_finish_points',
-                    'race_playoff_points',
-                    'qualified_to_16',
-                    'qualified_to_12',
-                    'qualified_to_8',
-                    'qualified_to_final',
-                    'champion',
-                    'best_position',
-                    'n_best_positions']
-    rename_cols = dict()
-    for col in standings_cols:
-        new_col_name = f"car_{col}"
-        rename_cols[col] = new_col_name
-        car_standings_data = car_standings_data.rename(columns=rename_cols)
-
+    car_standings_data = rank_car_standings(car_standings_data)
     standings_data = standings_data.merge(car_standings_data, on='driver_name')
     standings_data['season_year'] = season_year
     standings_data['race_number'] = race_number
     return standings_data
 
+def rank_car_standings(car_standings_data: pd.DataFrame) -> pd.DataFrame:
+    """Car standings sorted with a car_position, every standings column renamed to car_<column> in one go."""
+    car_standings_data = car_standings_data.sort_values(
+        by=['season_points', 'best_position', 'n_best_positions'],
+        ascending=[False, True, False])
+    car_standings_data['car_position'] = [x for x in range(1, len(car_standings_data) + 1)]
+    return car_standings_data.rename(columns={col: f'car_{col}' for col in car_standings_cols})
+
 def compose_bubble(data: pd.DataFrame, playoff_drivers: int, wins_column: str) -> pd.DataFrame:
     standings_data = data.sort_values(by=[wins_column, 'season_points'], ascending=False).reset_index(drop=True)
     standings_data['pos'] = [x for x in range(1, len(standings_data) + 1)]
@@ -1,6 +1,8 @@
 import pandas as pd
 from datetime import datetime
 
+from race_store import RaceStore
+
 seasons = [2022, 2023, 2024, 2025]
 
 
@@ -12,11 +14,12 @@ class FeatureProcessor:
         return data, track_data, calendar
     
     def load_data_csv(self) -> pd.DataFrame:
-        df = pd.read_csv('data/race_results.csv')
-        race_data = pd.read_csv('data/race_data.csv')
+        race_store = RaceStore()
+        df = race_store.load('race_results', seasons)
+        race_data = race_store.load('race_data', seasons)
         df = df.merge(race_data[['season_year', 'race_number', 'race_date']], on=['season_year', 'race_number'], how='left')
 
-        standings = pd.read_csv('data/standings.csv')
+        standings = race_store.load('standings', seasons)
         standings_cols = [col for col in standings.columns]
         df = df.merge(standings[standings_cols], on=['season_year', 'race_number', 'driver_name'], how='inner')
         df['race_date'] = pd.to_datetime(df['race_date'])
@@ -25,7 +28,7 @@ class FeatureProcessor:
         calendar['race_date'] = pd.to_datetime(calendar['race_date']).dt.date
         calendar = calendar.merge(pd.read_csv('data/track_names.csv'), on='track_name', how='left')
         df = df.merge(calendar[['season_year', 'race_number', 'season_stage', 'track_name']], on=['season_year', 'race_number'])
-        loop_data = pd.read_csv('data/loop_data.csv')
+        loop_data = race_store.load('loop_data', seasons)
         loop_data = loop_data.drop(columns='laps_led')
         temp_race_data = race_data[['season_year', 'race_number']].merge(
             loop_data[['season_year', 'race_number', 'green_flag_passes', 'quality_passes', 'total_laps', 'driver_rating']],
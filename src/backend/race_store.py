@@ -0,0 +1,93 @@
+import json
+import os
+
+import pandas as pd
+
+
+store_tables = ['race_results', 'standings', 'race_data', 'loop_data']
+
+
+class RaceStore:
+    """
+    Race tables kept as one CSV partition per season, plus a manifest of the races
+    and the partition size written for every season. Adding a race appends to one
+    partition, and readers only open the seasons they ask for.
+    """
+    def __init__(self, data_path: str = 'data'):
+        self.root = os.path.join(data_path, 'race_store')
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as file:
+                self.manifest = json.load(file)
+        return
+
+    def seasons(self, table: str) -> list:
+        return sorted(int(season) for season in self.manifest.get(table, {}).get('seasons', {}))
+
+    def races(self, table: str) -> set:
+        return {(int(season), int(race_number))
+                for season, partition in self.manifest.get(table, {}).get('seasons', {}).items()
+                for race_number in partition['races']}
+
+    def has_race(self, table: str, season: int, race_number: int) -> bool:
+        partition = self.manifest.get(table, {}).get('seasons', {}).get(str(season))
+        return partition is not None and str(race_number) in partition['races']
+
+    def append_race(self, table: str, season: int, race_number: int, data) -> bool:
+        if self.has_race(table, season, race_number):
+            return False
+        frame = pd.DataFrame(data)
+        table_manifest = self.manifest.setdefault(table, {'columns': list(frame.columns), 'seasons': {}})
+        frame = frame.reindex(columns=table_manifest['columns'])
+        partition = table_manifest['seasons'].setdefault(str(season), {'races': {}, 'size': 0})
+        path = self._partition_path(table, season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > partition['size']:
+            # Drop rows left over from an append that never made it into the manifest
+            os.truncate(path, partition['size'])
+        frame.to_csv(path, mode='a', header=partition['size'] == 0, index=False)
+        partition['races'][str(race_number)] = len(frame)
+        partition['size'] = os.path.getsize(path)
+        self._save_manifest()
+        return True
+
+    def load(self, table: str, seasons: list | None = None, usecols: list | None = None) -> pd.DataFrame:
+        if seasons is None:
+            seasons = self.seasons(table)
+        frames = [pd.read_csv(self._partition_path(table, season), usecols=usecols)
+                  for season in sorted(seasons) if season in self.seasons(table)]
+        if not frames:
+            return pd.DataFrame(columns=usecols or self.manifest.get(table, {}).get('columns', []))
+        return pd.concat(frames, ignore_index=True)
+
+    def import_table(self, table: str, frame: pd.DataFrame) -> None:
+        """Replaces a table with the content of frame, e.g. when moving over a flat CSV."""
+        self.manifest[table] = {'columns': list(frame.columns), 'seasons': {}}
+        for season, season_frame in frame.groupby('season_year', sort=True):
+            path = self._partition_path(table, season)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            season_frame.to_csv(path, index=False)
+            self.manifest[table]['seasons'][str(season)] = {
+                'races': {str(race_number): int(rows)
+                          for race_number, rows in season_frame.groupby('race_number', sort=False).size().items()},
+                'size': os.path.getsize(path),
+            }
+        self._save_manifest()
+        return
+
+    def _partition_path(self, table: str, season: int) -> str:
+        return os.path.join(self.root, table, f'{season}.csv')
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(f'{self.manifest_path}.tmp', 'w') as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(f'{self.manifest_path}.tmp', self.manifest_path)
+        return
+
+
+if __name__ == '__main__':
+    store = RaceStore()
+    for table in store_tables:
+        store.import_table(table, pd.read_csv(f'data/{table}.csv'))
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from race_store import RaceStore
+
+
+class SeasonDataStore:
+    """Standings joined with race positions, read once per season."""
+    def __init__(self, data_path: str = 'data'):
+        self.race_store = RaceStore(data_path)
+        self.seasons = {}
+        return
+
+    def get_season(self, season_year: int) -> pd.DataFrame:
+        return self._load_season(int(season_year)).copy()
+
+    def _load_season(self, season_year: int) -> pd.DataFrame:
+        if season_year not in self.seasons:
+            standings = self.race_store.load('standings', [season_year])
+            race_res = self.race_store.load('race_results', [season_year],
+                                            usecols=['driver_name', 'season_year', 'race_number', 'race_pos'])
+            season_data = standings.merge(race_res, on=['driver_name', 'season_year', 'race_number'])
+            self.seasons[season_year] = season_data
+        return self.seasons[season_year]
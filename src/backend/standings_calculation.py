@@ -1,220 +1,316 @@
+import numpy as np
 import pandas as pd
 
 
-def standings_calculation(raw_data: pd.DataFrame, current_race: int, season: int, penalties: dict):
-    data = raw_data[raw_data['race_number'] <= current_race].reset_index(drop=True)
-    all_drivers = raw_data['driver_name'].unique()
-    season_points = {driver: 0 for driver in all_drivers}
-    pure_season_points = {driver: 0 for driver in all_drivers}
-    season_wins = {}
-    positions = {driver: [] for driver in all_drivers}
-    playoff_16_wins = {}
-    playoff_12_wins = {}
-    playoff_8_wins = {}
-    playoff_points = {driver: 0 for driver in all_drivers}
-    playoff_16_drivers = []
-    playoff_12_drivers = []
-    playoff_8_drivers = []
-    playoff_4_drivers = []
-    champion = None
-    for race in range(1, current_race + 1):
-        race_data = data[data['race_number'] == race]
-        
+SEASON_STANDINGS_POINTS = np.array([15, 10, 8, 7, 6, 5, 4, 3, 2, 1])
+
+
+def dual_standings_calculation(raw_data: pd.DataFrame, current_race: int, season: int,
+                               driver_penalties: dict, car_penalties: dict) -> tuple:
+    ledgers = StandingsLedgers(raw_data, season, driver_penalties, car_penalties)
+    ledgers.advance_to(current_race)
+    return ledgers.snapshots()
+
+
+class WinsCounter:
+    """Per-driver win counts. Ties are ranked by the order in which drivers got their first win."""
+    def __init__(self, n_drivers: int):
+        self.counts = np.zeros(n_drivers, dtype=np.int64)
+        self.order = np.zeros(n_drivers, dtype=np.int64)
+        self.sequence = 0
+        return
+
+    def add(self, codes: np.ndarray, amount: int) -> None:
+        new_codes = codes[self.counts[codes] == 0]
+        self.counts[codes] += amount
+        self.order[new_codes] = np.arange(self.sequence, self.sequence + len(new_codes))
+        self.sequence += len(new_codes)
+        return
+
+    def grow(self, n_new_drivers: int) -> None:
+        self.counts = np.append(self.counts, np.zeros(n_new_drivers, dtype=np.int64))
+        self.order = np.append(self.order, np.zeros(n_new_drivers, dtype=np.int64))
+        return
+
+    def ranked(self) -> np.ndarray:
+        codes = np.flatnonzero(self.counts)
+        return codes[np.lexsort((self.order[codes], -self.counts[codes]))]
+
+
+class StandingsLedgers:
+    """Driver and car standings of a season, both ledgers are updated in a single replay of the races."""
+    def __init__(self, raw_data: pd.DataFrame, season: int, driver_penalties: dict, car_penalties: dict):
+        self.driver = StandingsEngine(raw_data, season, driver_penalties)
+        self.car = StandingsEngine(raw_data, season, car_penalties, shared=self.driver)
+        self.current_race = 0
+        return
+
+    def extend(self, raw_data: pd.DataFrame) -> bool:
+        return self.driver.extend(raw_data) and self.car.extend_shared(self.driver)
+
+    def refresh_snapshots(self, snapshots: tuple) -> tuple:
+        return self.driver.refresh_snapshot(snapshots[0]), self.car.refresh_snapshot(snapshots[1])
+
+    def replay(self, last_race: int):
+        for race in range(self.current_race + 1, last_race + 1):
+            self.add_race(race)
+            yield race, self.snapshots()
+
+    def advance_to(self, last_race: int) -> None:
+        for race in range(self.current_race + 1, last_race + 1):
+            self.add_race(race)
+        return
+
+    def add_race(self, race: int) -> None:
+        # The car ledger reads the finishing positions the driver ledger has just added
+        self.driver.add_race(race)
+        self.car.add_race(race)
+        self.current_race = race
+        return
+
+    def snapshots(self) -> tuple:
+        return self.driver.snapshot(), self.car.snapshot()
+
+
+class StandingsEngine:
+    """
+    Replays a season race by race, keeping the standings state between races. An engine created with
+    shared=<engine> reuses that engine's season data and finishing positions, which penalties don't change.
+    """
+    def __init__(self, raw_data: pd.DataFrame, season: int, penalties: dict, shared: 'StandingsEngine | None' = None):
+        self.season = season
+        self.penalties = [record for record in penalties.values() if record['season'] == season]
+        self.all_drivers = raw_data['driver_name'].unique()
+        n_drivers = len(self.all_drivers)
+        self.season_points = np.zeros(n_drivers, dtype=np.int64)
+        self.pure_season_points = np.zeros(n_drivers, dtype=np.int64)
+        self.playoff_points = np.zeros(n_drivers, dtype=np.int64)
+        self.season_wins = WinsCounter(n_drivers)
+        self.playoff_16_wins = WinsCounter(n_drivers)
+        self.playoff_12_wins = WinsCounter(n_drivers)
+        self.playoff_8_wins = WinsCounter(n_drivers)
+        self.best_position = np.zeros(n_drivers, dtype=np.int64)
+        self.n_best_positions = np.zeros(n_drivers, dtype=np.int64)
+        self.has_position = np.zeros(n_drivers, dtype=bool)
+        self.no_playoff_drivers = np.zeros(n_drivers, dtype=bool)
+        self.playoff_16_drivers = np.zeros(n_drivers, dtype=bool)
+        self.playoff_12_drivers = np.zeros(n_drivers, dtype=bool)
+        self.playoff_8_drivers = np.zeros(n_drivers, dtype=bool)
+        self.playoff_4_drivers = np.zeros(n_drivers, dtype=bool)
+        self.champion = None
+        self.current_race = 0
+        self.shares_positions = shared is not None
+        if shared is None:
+            self._load_season(raw_data)
+        else:
+            self._share_season(shared)
+        return
+
+    def extend(self, raw_data: pd.DataFrame) -> bool:
+        """Picks up a newer version of the season data. Returns False if the already replayed drivers changed."""
+        if not self._grow(raw_data['driver_name'].unique()):
+            return False
+        self._load_season(raw_data)
+        return True
+
+    def extend_shared(self, engine: 'StandingsEngine') -> bool:
+        """extend() for an engine created with shared=engine, after engine itself was extended."""
+        if not self._grow(engine.all_drivers):
+            return False
+        self._share_season(engine)
+        return True
+
+    def refresh_snapshot(self, snapshot: pd.DataFrame) -> pd.DataFrame:
+        """Updates a snapshot taken before extend() with the season-wide driver list and totals."""
+        new_drivers = self.all_drivers[len(snapshot):]
+        if len(new_drivers) > 0:
+            padding = pd.DataFrame({col: 0 for col in snapshot.columns}, index=range(len(new_drivers)))
+            padding['driver_name'] = new_drivers
+            padding['best_position'] = '-'
+            padding['n_best_positions'] = '-'
+            snapshot = pd.concat([snapshot, padding], ignore_index=True)
+        else:
+            snapshot = snapshot.copy()
+        for col, totals in self.season_totals.items():
+            snapshot[col] = totals
+        return snapshot
+
+    def add_race(self, race: int) -> None:
+        race_data = self.races.get(race, self.empty_race)
+
         if race < 27:
             # Regular season
-            for driver in race_data['driver_name'].unique():
-                race_points = race_data[race_data['driver_name'] == driver]['race_season_points'].values[0]
-                season_points[driver] += race_points
-                pure_season_points[driver] += race_points
-                positions[driver].append(race_data[race_data['driver_name'] == driver]['race_pos'].values[0])
-                playoff_points[driver] += 5 * race_data[race_data['driver_name'] == driver]['wins'].values[0] + \
-                    race_data[race_data['driver_name'] == driver]['stage_wins'].values[0]
-                if race_data[race_data['driver_name'] == driver]['wins'].values[0] == 1:
-                    season_wins[driver] = season_wins.get(driver, 0) + 1
+            self._score_race(race_data, self.no_playoff_drivers, self.season_wins)
         if race == 27:
-            playoff_16_drivers = [driver for driver, _ in sorted(season_wins.items(), key=lambda item: item[1], reverse=True)]
-            top_points_drivers = [driver for driver, _ in sorted(season_points.items(), key=lambda item: item[1], reverse=True)]
-            i = 0
-            while len(playoff_16_drivers) < 16:
-                if top_points_drivers[i] not in playoff_16_drivers:
-                    playoff_16_drivers.append(top_points_drivers[i])
-                i += 1
-            season_standings_points = [15, 10, 8, 7, 6, 5, 4, 3, 2, 1]
-            i = 0
-            for driver in top_points_drivers[:10]:
-                if driver in playoff_16_drivers:
-                    playoff_points[driver] += season_standings_points[i]
-                i += 1
-            for driver in playoff_16_drivers:
-                season_points[driver] = 2000
-                season_points[driver] += playoff_points[driver]
-                pure_season_points[driver] = season_points[driver]
+            self.playoff_16_drivers, top_points_drivers = self._cut_playoff_field(self.season_wins, 16)
+            top_10 = top_points_drivers[:10]
+            qualified = self.playoff_16_drivers[top_10]
+            self.playoff_points[top_10[qualified]] += SEASON_STANDINGS_POINTS[:len(top_10)][qualified]
+            field = self.playoff_16_drivers
+            self.season_points[field] = 2000 + self.playoff_points[field]
+            self.pure_season_points[field] = self.season_points[field]
         if race in (27, 28, 29):
-            for driver in race_data['driver_name'].unique():
-                race_points = race_data[race_data['driver_name'] == driver]['race_season_points'].values[0]
-                season_points[driver] += race_points
-                pure_season_points[driver] += race_points
-                positions[driver].append(race_data[race_data['driver_name'] == driver]['race_pos'].values[0])
-                playoff_points[driver] += 5 * race_data[race_data['driver_name'] == driver]['wins'].values[0] + \
-                    race_data[race_data['driver_name'] == driver]['stage_wins'].values[0]
-                if race_data[race_data['driver_name'] == driver]['wins'].values[0] == 1:
-                    if driver in playoff_16_drivers:
-                        playoff_16_wins[driver] = playoff_16_wins.get(driver, 0) + 1
-                    else:
-                        season_wins[driver] = season_wins.get(driver, 0) + 1
+            self._score_race(race_data, self.playoff_16_drivers, self.playoff_16_wins)
         if race == 30:
-            playoff_12_drivers = [driver for driver, _ in sorted(playoff_16_wins.items(), key=lambda item: item[1], reverse=True)]
-            top_points_drivers = [driver for driver, _ in sorted(season_points.items(), key=lambda item: item[1], reverse=True)]
-            i = 0
-            while len(playoff_12_drivers) < 12:
-                if top_points_drivers[i] not in playoff_12_drivers:
-                    playoff_12_drivers.append(top_points_drivers[i])
-                i += 1
-            for driver in playoff_12_drivers:
-                season_points[driver] = 3000
-                season_points[driver] += playoff_points[driver]
+            self.playoff_12_drivers, _ = self._cut_playoff_field(self.playoff_16_wins, 12)
+            field = self.playoff_12_drivers
+            self.season_points[field] = 3000 + self.playoff_points[field]
         if race in (30, 31, 32):
-            for driver in race_data['driver_name'].unique():
-                race_points = race_data[race_data['driver_name'] == driver]['race_season_points'].values[0]
-                season_points[driver] += race_points
-                pure_season_points[driver] += race_points
-                positions[driver].append(race_data[race_data['driver_name'] == driver]['race_pos'].values[0])
-                playoff_points[driver] += 5 * race_data[race_data['driver_name'] == driver]['wins'].values[0] + \
-                    race_data[race_data['driver_name'] == driver]['stage_wins'].values[0]
-                if race_data[race_data['driver_name'] == driver]['wins'].values[0] == 1:
-                    if driver in playoff_12_drivers:
-                        playoff_12_wins[driver] = playoff_12_wins.get(driver, 0) + 1
-                    else:
-                        season_wins[driver] = season_wins.get(driver, 0) + 1
+            self._score_race(race_data, self.playoff_12_drivers, self.playoff_12_wins)
         if race == 33:
-            playoff_8_drivers = [driver for driver, _ in sorted(playoff_12_wins.items(), key=lambda item: item[1], reverse=True)]
-            top_points_drivers = [driver for driver, _ in sorted(season_points.items(), key=lambda item: item[1], reverse=True)]
-            i = 0
-            while len(playoff_8_drivers) < 8:
-                if top_points_drivers[i] not in playoff_8_drivers:
-                    playoff_8_drivers.append(top_points_drivers[i])
-                i += 1
-            for driver in playoff_8_drivers:
-                season_points[driver] = 4000
-                season_points[driver] += playoff_points[driver]
-            for driver in playoff_12_drivers:
-                if driver not in playoff_8_drivers:
-                    season_points[driver] = pure_season_points[driver]
+            self.playoff_8_drivers, _ = self._cut_playoff_field(self.playoff_12_wins, 8)
+            field = self.playoff_8_drivers
+            self.season_points[field] = 4000 + self.playoff_points[field]
+            eliminated = self.playoff_12_drivers & ~field
+            self.season_points[eliminated] = self.pure_season_points[eliminated]
         if race in (33, 34, 35):
-            for driver in race_data['driver_name'].unique():
-                race_points = race_data[race_data['driver_name'] == driver]['race_season_points'].values[0]
-                season_points[driver] += race_points
-                pure_season_points[driver] += race_points
-                positions[driver].append(race_data[race_data['driver_name'] == driver]['race_pos'].values[0])
-                playoff_points[driver] += 5 * race_data[race_data['driver_name'] == driver]['wins'].values[0] + \
-                    race_data[race_data['driver_name'] == driver]['stage_wins'].values[0]
-                if race_data[race_data['driver_name'] == driver]['wins'].values[0] == 1:
-                    if driver in playoff_8_drivers:
-                        playoff_8_wins[driver] = playoff_8_wins.get(driver, 0) + 1
-                    else:
-                        season_wins[driver] = season_wins.get(driver, 0) + 1
+            self._score_race(race_data, self.playoff_8_drivers, self.playoff_8_wins)
         if race == 36:
-            playoff_4_drivers = [driver for driver, _ in sorted(playoff_8_wins.items(), key=lambda item: item[1], reverse=True)]
-            top_points_drivers = [driver for driver, _ in sorted(season_points.items(), key=lambda item: item[1], reverse=True)]
-            i = 0
-            while len(playoff_4_drivers) < 4:
-                if top_points_drivers[i] not in playoff_4_drivers:
-                    playoff_4_drivers.append(top_points_drivers[i])
-                i += 1
-            for driver in playoff_4_drivers:
-                season_points[driver] = 5000
-            for driver in playoff_8_drivers:
-                if driver not in playoff_4_drivers:
-                    season_points[driver] = pure_season_points[driver]
-            for driver in race_data['driver_name'].unique():
-                if driver in playoff_4_drivers:
-                    season_points[driver] += race_data[race_data['driver_name'] == driver]['race_finish_points'].values[0]
-                else:
-                    pure_season_points[driver] += race_data[race_data['driver_name'] == driver]['race_season_points'].values[0]
-            champion = [driver for driver, _ in sorted(season_points.items(), key=lambda item: item[1], reverse=True)][0]
-            for driver in season_points.keys():
-                if driver not in playoff_4_drivers:
-                    season_points[driver] = pure_season_points[driver]
-        season_points, playoff_points, season_wins, playoff_16_wins, playoff_12_wins, playoff_8_wins = apply_penalties(season,
-                                                                     race,
-                                                                     season_points,
-                                                                     playoff_points,
-                                                                     season_wins,
-                                                                     playoff_16_wins,
-                                                                     playoff_12_wins,
-                                                                     playoff_8_wins,
-                                                                     penalties)
-    data = raw_data[
-        ['driver_name', 'stage_wins', 'race_stage_points', 'race_finish_points']
-        ].groupby('driver_name', as_index=False).sum()
-    best_position = {}
-    n_best_positions = {}
-    for driver in all_drivers:
-        if len(positions[driver]) > 0:
-            best_position[driver] = min(positions[driver])
-            n_best_positions[driver] = sum([1 if pos == min(positions[driver]) else 0 for pos in positions[driver]])
-        else:
-            best_position[driver] = '-'
-            n_best_positions[driver] = '-'
-        
-    standings = pd.DataFrame({'driver_name': all_drivers,
-                    'season_points': [season_points[driver] for driver in all_drivers],
-                    'wins': [season_wins.get(driver, 0) + \
-                            playoff_16_wins.get(driver, 0) + \
-                            playoff_12_wins.get(driver, 0) + \
-                            playoff_8_wins.get(driver, 0) + \
-                            (driver == champion) for driver in all_drivers],
-                    'season_wins': [season_wins.get(driver, 0) for driver in all_drivers],
-                    'playoff_16_wins': [playoff_16_wins.get(driver, 0) for driver in all_drivers],
-                    'playoff_12_wins': [playoff_12_wins.get(driver, 0) for driver in all_drivers],
-                    'playoff_8_wins': [playoff_8_wins.get(driver, 0) for driver in all_drivers],
-                    'stage_wins': [data[data['driver_name'] == driver]['stage_wins'].values[0] \
-                                    if driver in data['driver_name'].unique() else 0 for driver in all_drivers],
-                    'race_stage_points': [data[data['driver_name'] == driver]['race_stage_points'].values[0] \
-                                    if driver in data['driver_name'].unique() else 0 for driver in all_drivers],
-                    'race_finish_points': [data[data['driver_name'] == driver]['race_finish_points'].values[0] \
-                                    if driver in data['driver_name'].unique() else 0 for driver in all_drivers],
-                    'race_playoff_points': [playoff_points[driver] for driver in all_drivers],
-                    'qualified_to_16': [1 if driver in playoff_16_drivers else 0 for driver in all_drivers],
-                    'qualified_to_12': [1 if driver in playoff_12_drivers else 0 for driver in all_drivers],
-                    'qualified_to_8': [1 if driver in playoff_8_drivers else 0 for driver in all_drivers],
-                    'qualified_to_final': [1 if driver in playoff_4_drivers else 0 for driver in all_drivers],
-                    'champion': [1 if driver == champion else 0 for driver in all_drivers],
-                    'best_position': [best_position[driver] for driver in all_drivers],
-                    'n_best_positions': [n_best_positions[driver] for driver in all_drivers],})
-    return standings
-
-def apply_penalties(season: int,
-                    current_race: int,
-                    season_points: dict,
-                    playoff_points: dict,
-                    season_wins: dict,
-                    playoff_16_wins: dict,
-                    playoff_12_wins: dict,
-                    playoff_8_wins: dict,
-                    penalties: dict):
-    for _, record in penalties.items():
-        if (record['season'] == season) and (record['race'] == current_race):
+            self.playoff_4_drivers, _ = self._cut_playoff_field(self.playoff_8_wins, 4)
+            field = self.playoff_4_drivers
+            self.season_points[field] = 5000
+            eliminated = self.playoff_8_drivers & ~field
+            self.season_points[eliminated] = self.pure_season_points[eliminated]
+            codes = race_data['codes']
+            in_final = field[codes]
+            self.season_points[codes[in_final]] += race_data['race_finish_points'][in_final]
+            self.pure_season_points[codes[~in_final]] += race_data['race_season_points'][~in_final]
+            self.champion = int(np.argmax(self.season_points))
+            self.season_points[~field] = self.pure_season_points[~field]
+        self._apply_penalties(race)
+        self.current_race = race
+        return
+
+    def snapshot(self) -> pd.DataFrame:
+        champion = np.zeros(len(self.all_drivers), dtype=np.int64)
+        if self.champion is not None:
+            champion[self.champion] = 1
+        standings = pd.DataFrame({'driver_name': self.all_drivers,
+                        'season_points': self.season_points.copy(),
+                        'wins': self.season_wins.counts + \
+                                self.playoff_16_wins.counts + \
+                                self.playoff_12_wins.counts + \
+                                self.playoff_8_wins.counts + \
+                                champion,
+                        'season_wins': self.season_wins.counts.copy(),
+                        'playoff_16_wins': self.playoff_16_wins.counts.copy(),
+                        'playoff_12_wins': self.playoff_12_wins.counts.copy(),
+                        'playoff_8_wins': self.playoff_8_wins.counts.copy(),
+                        'stage_wins': self.season_totals['stage_wins'],
+                        'race_stage_points': self.season_totals['race_stage_points'],
+                        'race_finish_points': self.season_totals['race_finish_points'],
+                        'race_playoff_points': self.playoff_points.copy(),
+                        'qualified_to_16': self.playoff_16_drivers.astype(np.int64),
+                        'qualified_to_12': self.playoff_12_drivers.astype(np.int64),
+                        'qualified_to_8': self.playoff_8_drivers.astype(np.int64),
+                        'qualified_to_final': self.playoff_4_drivers.astype(np.int64),
+                        'champion': champion,
+                        'best_position': self._fill_missing_positions(self.best_position),
+                        'n_best_positions': self._fill_missing_positions(self.n_best_positions),})
+        return standings
+
+    def _grow(self, all_drivers: np.ndarray) -> bool:
+        n_new_drivers = len(all_drivers) - len(self.all_drivers)
+        if n_new_drivers < 0 or list(all_drivers[:len(self.all_drivers)]) != list(self.all_drivers):
+            return False
+        self.all_drivers = all_drivers
+        for name in ['season_points', 'pure_season_points', 'playoff_points', 'best_position', 'n_best_positions',
+                     'has_position', 'no_playoff_drivers', 'playoff_16_drivers', 'playoff_12_drivers',
+                     'playoff_8_drivers', 'playoff_4_drivers']:
+            values = getattr(self, name)
+            setattr(self, name, np.append(values, np.zeros(n_new_drivers, dtype=values.dtype)))
+        for wins in [self.season_wins, self.playoff_16_wins, self.playoff_12_wins, self.playoff_8_wins]:
+            wins.grow(n_new_drivers)
+        return True
+
+    def _share_season(self, engine: 'StandingsEngine') -> None:
+        self.all_drivers = engine.all_drivers
+        self.driver_codes = engine.driver_codes
+        self.season_totals = engine.season_totals
+        self.races = engine.races
+        self.empty_race = engine.empty_race
+        self.best_position = engine.best_position
+        self.n_best_positions = engine.n_best_positions
+        self.has_position = engine.has_position
+        return
+
+    def _load_season(self, raw_data: pd.DataFrame) -> None:
+        self.driver_codes = {driver: code for code, driver in enumerate(self.all_drivers)}
+        codes = pd.Index(self.all_drivers).get_indexer(raw_data['driver_name'])
+        self.season_totals = {}
+        for col in ['stage_wins', 'race_stage_points', 'race_finish_points']:
+            self.season_totals[col] = np.zeros(len(self.all_drivers), dtype=np.int64)
+            np.add.at(self.season_totals[col], codes, raw_data[col].to_numpy())
+
+        # Only the first row of a driver in a race is scored
+        first_rows = ~raw_data.duplicated(['race_number', 'driver_name']).to_numpy()
+        race_cols = ['race_season_points', 'race_finish_points', 'race_pos', 'wins', 'stage_wins']
+        race_values = {col: raw_data[col].to_numpy()[first_rows] for col in race_cols}
+        race_values['codes'] = codes[first_rows]
+        race_numbers = raw_data['race_number'].to_numpy()[first_rows]
+        self.races = {}
+        for race, rows in pd.Series(race_numbers).groupby(race_numbers, sort=False).indices.items():
+            self.races[race] = {col: values[rows] for col, values in race_values.items()}
+        self.empty_race = {col: values[:0] for col, values in race_values.items()}
+        return
+
+    def _score_race(self, race_data: dict, playoff_drivers: np.ndarray, playoff_wins: WinsCounter) -> None:
+        codes = race_data['codes']
+        self.season_points[codes] += race_data['race_season_points']
+        self.pure_season_points[codes] += race_data['race_season_points']
+        if not self.shares_positions:
+            self._add_positions(codes, race_data['race_pos'])
+        self.playoff_points[codes] += 5 * race_data['wins'] + race_data['stage_wins']
+        winners = codes[race_data['wins'] == 1]
+        in_playoffs = playoff_drivers[winners]
+        playoff_wins.add(winners[in_playoffs], 1)
+        self.season_wins.add(winners[~in_playoffs], 1)
+        return
+
+    def _add_positions(self, codes: np.ndarray, positions: np.ndarray) -> None:
+        best_position = self.best_position[codes]
+        has_position = self.has_position[codes]
+        new_best = ~has_position | (positions < best_position)
+        same_best = has_position & (positions == best_position)
+        self.best_position[codes[new_best]] = positions[new_best]
+        self.n_best_positions[codes[new_best]] = 1
+        self.n_best_positions[codes[same_best]] += 1
+        self.has_position[codes] = True
+        return
+
+    def _fill_missing_positions(self, values: np.ndarray):
+        if self.has_position.all():
+            return values.copy()
+        values = values.astype(object)
+        values[~self.has_position] = '-'
+        return values
+
+    def _cut_playoff_field(self, wins: WinsCounter, field_size: int):
+        field = np.zeros(len(self.all_drivers), dtype=bool)
+        winners = wins.ranked()
+        field[winners] = True
+        top_points_drivers = np.argsort(-self.season_points, kind='stable')
+        if len(winners) < field_size:
+            contenders = top_points_drivers[~field[top_points_drivers]]
+            field[contenders[:field_size - len(winners)]] = True
+        return field, top_points_drivers
+
+    def _apply_penalties(self, current_race: int) -> None:
+        for record in self.penalties:
+            if record['race'] != current_race:
+                continue
+            code = self.driver_codes[record['driver_name']]
             if record['type'] == 'season_points':
-                season_points[record['driver_name']] -= record['amount']
+                self.season_points[code] -= record['amount']
             elif record['type'] == 'playoff_points':
-                playoff_points[record['driver_name']] -= record['amount']
+                self.playoff_points[code] -= record['amount']
             elif record['type'] == 'race_win':
                 if current_race <= 26:
-                    season_wins[record['driver_name']] = season_wins.get(record['driver_name'], 0) - 1
-                    season_wins = delete_loser(season_wins, record['driver_name'])
+                    self.season_wins.add(np.array([code]), -1)
                 elif current_race <= 29:
-                    playoff_16_wins[record['driver_name']] = playoff_16_wins.get(record['driver_name'], 0) - 1
-                    playoff_16_wins = delete_loser(playoff_16_wins, record['driver_name'])
+                    self.playoff_16_wins.add(np.array([code]), -1)
                 elif current_race <= 32:
-                    playoff_12_wins[record['driver_name']] = playoff_12_wins.get(record['driver_name'], 0) - 1
-                    playoff_12_wins = delete_loser(playoff_12_wins, record['driver_name'])
+                    self.playoff_12_wins.add(np.array([code]), -1)
                 elif current_race <= 35:
-                    playoff_8_wins[record['driver_name']] = playoff_8_wins.get(record['driver_name'], 0) - 1
-                    playoff_8_wins = delete_loser(playoff_8_wins, record['driver_name'])
-    return season_points, playoff_points, season_wins, playoff_16_wins, playoff_12_wins, playoff_8_wins
-
-def delete_loser(wins_dist, driver):
-    if wins_dist[driver] == 0:
-        del wins_dist[driver]
-    return wins_dist
+                    self.playoff_8_wins.add(np.array([code]), -1)
+        return
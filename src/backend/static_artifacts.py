@@ -0,0 +1,102 @@
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = 'data_manifest.json'
+HASHED_DIR = 'hashed'
+BROTLI_QUALITY = 11
+
+
+def publish_artifacts(data_dir: str = '../../public/data') -> dict:
+    """
+    Gives every exported JSON file .gz/.br siblings and a content-hashed copy under hashed/, e.g.
+    standings_2024.json -> hashed/standings_2024.3f2a9c1b7d4e.json, and writes data_manifest.json
+    mapping the plain names to the hashed ones. Hashed files never change, so they can be cached
+    forever, and a file whose content did not change keeps its name and is not rewritten.
+    """
+    if brotli is None:
+        logging.warning('brotli is not installed, only .gz files are written')
+    manifest_path = os.path.join(data_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            previous = json.load(file)
+
+    manifest = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.json'))):
+        name = os.path.basename(path)
+        if name == MANIFEST_NAME:
+            continue
+        with open(path, 'rb') as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        stem, extension = os.path.splitext(name)
+        hashed_name = f'{HASHED_DIR}/{stem}.{digest[:12]}{extension}'
+        hashed_path = os.path.join(data_dir, hashed_name)
+        expected = [hashed_path] + [f'{target}{suffix}' for target in (path, hashed_path)
+                                    for suffix in compressed_suffixes()]
+        if previous.get(name, {}).get('sha256') != digest or not all(map(os.path.exists, expected)):
+            compressed = compress(content)
+            write_compressed(path, compressed)
+            os.makedirs(os.path.dirname(hashed_path), exist_ok=True)
+            write_file(hashed_path, content)
+            write_compressed(hashed_path, compressed)
+        manifest[name] = {'file': hashed_name, 'sha256': digest, 'bytes': len(content)}
+
+    content = json.dumps(manifest, indent=2, sort_keys=True).encode()
+    write_file(manifest_path, content)
+    write_compressed(manifest_path, compress(content))
+    remove_unreferenced(data_dir, manifest, previous)
+    return manifest
+
+
+def compressed_suffixes() -> list:
+    return ['.gz'] + (['.br'] if brotli is not None else [])
+
+
+def compress(content: bytes) -> dict:
+    # mtime=0 keeps the .gz bytes the same for the same content
+    compressed = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        # Quality 11 takes seconds per season file but is ~25% smaller than 9, unchanged files are skipped
+        compressed['.br'] = brotli.compress(content, quality=BROTLI_QUALITY)
+    return compressed
+
+
+def write_compressed(path: str, compressed: dict) -> None:
+    for suffix, content in compressed.items():
+        write_file(f'{path}{suffix}', content)
+    return
+
+
+def write_file(path: str, content: bytes) -> None:
+    with open(f'{path}.tmp', 'wb') as file:
+        file.write(content)
+    os.replace(f'{path}.tmp', path)
+    return
+
+
+def remove_unreferenced(data_dir: str, manifest: dict, previous: dict) -> None:
+    """Hashed files of the previous manifest are kept, clients that loaded it may still request them."""
+    referenced = {entry['file'] for entry in list(manifest.values()) + list(previous.values())}
+    for path in glob.glob(os.path.join(data_dir, HASHED_DIR, '*')):
+        name = f'{HASHED_DIR}/{os.path.basename(path)}'
+        for suffix in ('.gz', '.br'):
+            name = name.removesuffix(suffix)
+        if name not in referenced:
+            os.remove(path)
+    return
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    published = publish_artifacts()
+    logging.info(f'{len(published)} data files published')
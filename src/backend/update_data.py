@@ -1,10 +1,19 @@
+import argparse
 import pandas as pd
 from typing import Tuple, Any
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 
 import data_processing
 from process_data import FeatureProcessor
+from season_data import SeasonDataStore
 from entry_list import drivers_2025
+from penalties import penalties_driver, penalties_team
+from update_state import UpdateStateStore, fingerprint
+from compact_json import compact_path, write_compact
+from static_artifacts import publish_artifacts
 
 
 drop_cols_race = ['stage_1_pos', 'stage_2_pos', 'stage_3_pos', 
@@ -20,6 +29,14 @@ global_race_data_cols = ['track_name', 'race_date', 'cautions_number',
                          'track_type', 'season_stage']
 
 class DataProcessor:
+    def __init__(self, workers: int = 1, incremental: bool = False, compact: bool = False, artifacts: bool = False):
+        self.workers = workers
+        self.incremental = incremental
+        self.compact = compact
+        self.artifacts = artifacts
+        self.update_state = UpdateStateStore()
+        return
+
     def update_data(self):
         df, track_data, calendar, (next_race_data, last_race_data) = self.get_stats()
         calendar.to_json(f'../../public/data/calendar.json', orient='records')
@@ -29,27 +46,92 @@ class DataProcessor:
             json.dump(next_race_data, file)
         with open('../../public/data/last_race_data.json', 'w') as file:
             json.dump(last_race_data, file)
+        last_races = []
         for season_year in years:
-            season_standings = pd.DataFrame()
-            for race_number in range(1, 37):
-                if (season_year == int(last_race_data['last_race_season'])) & (race_number > int(last_race_data['last_race_number'])):
-                    break
-                current_standings = pd.DataFrame(self.get_standings(season_year, race_number))
-                season_standings = pd.concat([season_standings, current_standings])
-            car_numbers = df[df['season_year'] == season_year][['driver_name', 'car_number']].drop_duplicates()
-            season_standings = season_standings.merge(car_numbers, on='driver_name')
-            season_standings = season_standings.merge(df[['season_year', 'race_number', 'race_date']].drop_duplicates(), on=['season_year', 'race_number'])
-            season_standings.drop(columns=drop_cols_standings).to_json(f'../../public/data/standings_{season_year}.json', orient='records')
-        fantasy_group_standings = season_standings[
-            (season_standings['season_year'] == int(last_race_data['last_race_season'])) &
-             (season_standings['race_number'] == int(last_race_data['last_race_number']))]
-        groups = self.make_fantasy_groups(fantasy_group_standings)
+            last_race = 36
+            if season_year == int(last_race_data['last_race_season']):
+                last_race = int(last_race_data['last_race_number'])
+            last_races.append(last_race)
+        final_standings = self.run_seasons(export_season_standings, df, years, last_races)
+        groups = self.make_fantasy_groups(final_standings[-1])
         df = df.merge(groups, on='driver_name', how='left')
-        for season_year in years:
-            current_df = df[df['season_year'] == season_year]
-            current_df.drop(columns=drop_cols_race).to_json(f'../../public/data/data_{season_year}.json', orient='records')
+        self.run_seasons(export_season_data, df, years)
+        if self.artifacts:
+            publish_artifacts('../../public/data')
+        return
+
+    def run_seasons(self, season_job, df: pd.DataFrame, *season_args) -> list:
+        # Seasons are independent, so with several workers each one runs in its own process
+        if self.workers <= 1:
+            init_season_worker(self, df)
+            return list(map(season_job, *season_args))
+        self.season_data  # create the season store before it is handed to the workers, each one loads its own seasons
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=init_season_worker,
+                                 initargs=(self, df)) as executor:
+            return list(executor.map(season_job, *season_args))
+
+    def export_season_standings(self, df: pd.DataFrame, season_year: int, last_race: int) -> pd.DataFrame:
+        output_path = f'../../public/data/standings_{season_year}.json'
+        car_numbers = df[df['season_year'] == season_year][['driver_name', 'car_number']].drop_duplicates()
+        race_dates = df[['season_year', 'race_number', 'race_date']].drop_duplicates()
+        if self.incremental:
+            state = self.update_state.load(f'standings_{season_year}')
+            season_input = self.season_data.get_season(season_year)
+            penalties = season_penalties(season_year)
+            input_hash = fingerprint(season_input,
+                                     penalties,
+                                     last_race,
+                                     car_numbers,
+                                     race_dates[race_dates['season_year'] == season_year])
+            if state.get('input_hash') == input_hash and self.exports_exist(output_path):
+                return state['final_standings']
+            replay_state = None
+            if 'replayed_race' in state:
+                replayed_input = season_input[season_input['race_number'] <= state['replayed_race']]
+                if state['replayed_hash'] == fingerprint(replayed_input, penalties):
+                    replay_state = state['replay_state']
+            replay_state = replay_state or {}
+        else:
+            replay_state = None
+        season_standings = self.get_season_standings(season_year, last_race, replay_state)
+        season_standings = season_standings.merge(car_numbers, on='driver_name')
+        season_standings = season_standings.merge(race_dates, on=['season_year', 'race_number'])
+        self.export_records(season_standings.drop(columns=drop_cols_standings), output_path)
+        final_standings = season_standings[season_standings['race_number'] == last_race]
+        if self.incremental:
+            replayed_input = season_input[season_input['race_number'] <= last_race]
+            self.update_state.save(f'standings_{season_year}', {
+                'input_hash': input_hash,
+                'final_standings': final_standings,
+                'replayed_race': last_race,
+                'replayed_hash': fingerprint(replayed_input, penalties),
+                'replay_state': replay_state,
+            })
+        return final_standings
+
+    def export_season_data(self, df: pd.DataFrame, season_year: int) -> None:
+        output_path = f'../../public/data/data_{season_year}.json'
+        current_df = df[df['season_year'] == season_year]
+        if self.incremental:
+            input_hash = fingerprint(current_df)
+            if self.update_state.load(f'data_{season_year}').get('input_hash') == input_hash and \
+                    self.exports_exist(output_path):
+                return
+        self.export_records(current_df.drop(columns=drop_cols_race), output_path)
+        if self.incremental:
+            self.update_state.save(f'data_{season_year}', {'input_hash': input_hash})
+        return
+
+    def export_records(self, data: pd.DataFrame, output_path: str) -> None:
+        data.to_json(output_path, orient='records')
+        if self.compact:
+            write_compact(data, output_path)
         return
 
+    def exports_exist(self, output_path: str) -> bool:
+        return os.path.exists(output_path) and (not self.compact or os.path.exists(compact_path(output_path)))
+
     def get_stats(self) -> Tuple[pd.DataFrame, pd.DataFrame, Tuple[Any]]:
         feature_processor = FeatureProcessor()
         df, track_data, calendar = feature_processor.prepare_dataset()
@@ -58,29 +140,20 @@ class DataProcessor:
         return df, track_data, calendar, (next_race_data, last_race_data)
 
     def get_standings(self, season_year: int, race_number: int) -> pd.DataFrame:
-        raw_data = pd.read_csv('data/standings.csv')
-        race_res = pd.read_csv('data/race_results.csv', usecols=['driver_name', 'season_year', 'race_number', 'race_pos'])
-        raw_data = raw_data.merge(race_res, on=['driver_name', 'season_year', 'race_number'])
-        raw_data = raw_data[raw_data['season_year'] == season_year].reset_index(drop=True)
-        raw_standings_data = []
-        for result in raw_data.iterrows():
-            current_row = {
-                        "driver_name": result[1]['driver_name'],
-                        "wins": result[1]['wins'],
-                        "stage_wins": result[1]['stage_wins'],
-                        "race_stage_points": result[1]['race_stage_points'],
-                        "race_finish_points": result[1]['race_finish_points'],
-                        "race_season_points": result[1]['race_season_points'],
-                        "race_playoff_points": result[1]['race_playoff_points'],
-                        "race_number": result[1]['race_number'],
-                        "season_year": int(season_year),
-                        "race_pos": result[1]['race_pos'],
-                     }
-            raw_standings_data.append(current_row)
-        season_standings_data = data_processing.compose_playoff_standings_data(raw_standings_data,
+        season_standings_data = data_processing.compose_playoff_standings_data(self.season_data.get_season(season_year),
                                                                                 race_number,
                                                                                 season_year)
         return season_standings_data.to_dict(orient='records')
+
+    def get_season_standings(self, season_year: int, last_race: int, replay_state: dict | None = None) -> pd.DataFrame:
+        return data_processing.compose_playoff_standings_history(self.season_data.get_season(season_year),
+                                                                 last_race,
+                                                                 season_year,
+                                                                 replay_state)
+
+    @cached_property
+    def season_data(self) -> SeasonDataStore:
+        return SeasonDataStore()
     
     def make_fantasy_groups(self, standings: pd.DataFrame) -> pd.DataFrame:
         standings = standings[standings['driver_name'].isin(drivers_2025)].reset_index(drop=True)
@@ -95,6 +168,43 @@ class DataProcessor:
         standings.loc[standings['car_position'] > 30, 'star_group'] = 'IV'
         return standings[['driver_name', 'open_group', 'star_group']]
     
+
+worker_processor = None
+worker_df = None
+
+
+def season_penalties(season_year: int) -> dict:
+    return {
+        'driver': [record for record in penalties_driver.values() if record['season'] == season_year],
+        'team': [record for record in penalties_team.values() if record['season'] == season_year],
+    }
+
+
+def init_season_worker(processor: DataProcessor, df: pd.DataFrame) -> None:
+    global worker_processor, worker_df
+    worker_processor = processor
+    worker_df = df
+    return
+
+
+def export_season_standings(season_year: int, last_race: int) -> pd.DataFrame:
+    return worker_processor.export_season_standings(worker_df, season_year, last_race)
+
+
+def export_season_data(season_year: int) -> None:
+    return worker_processor.export_season_data(worker_df, season_year)
+
+
 if __name__ == "__main__":
-    updater = DataProcessor()
-    updater.update_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=1, help='Number of seasons exported in parallel')
+    parser.add_argument('--incremental', action='store_true', help='Skip seasons whose inputs did not change')
+    parser.add_argument('--compact', action='store_true', help='Also write the columnar *.compact.json exports')
+    parser.add_argument('--artifacts', action='store_true',
+                        help='Write .gz/.br files, content-hashed copies and data_manifest.json for the exports')
+    args = parser.parse_args()
+    updater = DataProcessor(workers=args.workers,
+                            incremental=args.incremental,
+                            compact=args.compact,
+                            artifacts=args.artifacts)
+    updater.update_data()
@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+# Bump when the export logic changes, so that saved state from older code is not reused
+STATE_VERSION = 2
+
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(json.dumps(list(part.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class UpdateStateStore:
+    """Per-season state of the incremental update, kept between update runs."""
+    def __init__(self, state_dir: str = 'data/update_state'):
+        self.state_dir = state_dir
+        return
+
+    def load(self, name: str) -> dict:
+        path = os.path.join(self.state_dir, f'{name}.pkl')
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'rb') as file:
+            state = pickle.load(file)
+        if state.get('version') != STATE_VERSION:
+            return {}
+        return state
+
+    def save(self, name: str, state: dict) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = os.path.join(self.state_dir, f'{name}.pkl')
+        with open(f'{path}.tmp', 'wb') as file:
+            pickle.dump({**state, 'version': STATE_VERSION}, file)
+        os.replace(f'{path}.tmp', path)
+        return
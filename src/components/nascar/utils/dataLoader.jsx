@@ -6,7 +6,7 @@ export const getSeasonData = (dataType, season, raceNumber = 36) => {
           : (() => {
               throw new Error(`Unknown dataType: ${dataType}`);
             })();
-  const seasonData = loadJsonData(fileName).filter((race) => race.race_number <= raceNumber);
+  const seasonData = loadSeasonFile(fileName).filter((race) => race.race_number <= raceNumber);
   return seasonData;
 };
 
@@ -25,7 +25,7 @@ export const getManySeasonData = (dataType, startYear) => {
     }
 
     try {
-      results.push(...loadJsonData(fileName));
+      results.push(...loadSeasonFile(fileName));
     } catch (e) {
       console.warn(`Skipping missing or failed file: ${fileName}`);
     }
@@ -42,7 +42,7 @@ export const getTrackData = (startYear, track, trackFilterType = 'exact') => {
   for (const year of seasonRange) {
     const fileName = `data_${year}.json`;
     try {
-      const seasonData = loadJsonData(fileName);
+      const seasonData = loadSeasonFile(fileName);
       let filtered = seasonData;
       filtered = filtered.filter((race) => {
         const isExact = race.track_name === track;
@@ -64,7 +64,7 @@ export const getTrackData = (startYear, track, trackFilterType = 'exact') => {
 
 export const loadJsonData = (filename) => {
     const xhr = new XMLHttpRequest();
-    xhr.open("GET", `/data/${filename}`, false);
+    xhr.open("GET", `/data/${resolveDataFile(filename)}`, false);
     xhr.send();
     
     if (xhr.status === 200) {
@@ -72,4 +72,78 @@ export const loadJsonData = (filename) => {
     } else {
       throw new Error(`Failed to load ${filename}: ${xhr.status}`);
     }
-  };
\ No newline at end of file
+  };
+
+// data_manifest.json (update_data.py --artifacts) maps file names to content-hashed copies, which
+// only change when the data does and can be cached for good. Without a manifest the plain files are used.
+let dataManifest;
+
+const resolveDataFile = (filename) => {
+  if (dataManifest === undefined) {
+    dataManifest = {};
+    try {
+      const xhr = new XMLHttpRequest();
+      xhr.open("GET", "/data/data_manifest.json", false);
+      xhr.send();
+      if (xhr.status === 200) {
+        dataManifest = JSON.parse(xhr.responseText);
+      }
+    } catch (e) {
+      console.warn("No data manifest, loading the plain data files");
+    }
+  }
+  return dataManifest[filename]?.file ?? filename;
+};
+
+// Set VITE_COMPACT_DATA=true to read the *.compact.json exports (update_data.py --compact) instead
+const useCompactData = import.meta.env.VITE_COMPACT_DATA === "true";
+
+export const loadSeasonFile = (filename) =>
+  useCompactData
+    ? decodeCompact(loadJsonData(filename.replace(/\.json$/, ".compact.json")))
+    : loadJsonData(filename);
+
+// Turns a compact export back into the records of the plain file, the layout is described in
+// src/backend/compact_json.py
+export const decodeCompact = (payload) => {
+  if (payload.format !== "columnar-v1") {
+    throw new Error(`Unknown compact data format: ${payload.format}`);
+  }
+  const { columns, encodings, dictionaries, races } = payload;
+  const decoders = columns.map((column) => {
+    if (encodings[column] === "dictionary") {
+      const dictionary = dictionaries[column];
+      return (value) => (value === null ? null : dictionary[value]);
+    }
+    if (encodings[column] === "numeric_string") {
+      return (value) => (typeof value === "number" ? String(value) : value);
+    }
+    return (value) => value;
+  });
+
+  // Records are copied from a template with every key, so they all share one object shape
+  const template = Object.fromEntries(columns.map((column) => [column, null]));
+  const records = [];
+  for (const race of races) {
+    const constant = columns.map((column) => column in race.constants);
+    const values = columns.map((column, i) =>
+      constant[i] ? decoders[i](race.constants[column]) : race.columns[column].map(decoders[i])
+    );
+    for (let row = 0; row < race.rows; row++) {
+      const record = { ...template };
+      for (let i = 0; i < columns.length; i++) {
+        record[columns[i]] = constant[i] ? values[i] : values[i][row];
+      }
+      records.push(record);
+    }
+  }
+
+  if (!payload.order) {
+    return records;
+  }
+  const ordered = new Array(records.length);
+  payload.order.forEach((position, i) => {
+    ordered[position] = records[i];
+  });
+  return ordered;
+};
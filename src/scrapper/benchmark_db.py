@@ -0,0 +1,126 @@
+import argparse
+import logging
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+from sqlalchemy import text
+
+from db_connectors import DBReader, DBWriter
+from db_engine import sqlite_url
+from db_schema import metadata
+from tracks_to_types import tracks_to_types
+
+
+def seed_rows(seasons: list, races: int, drivers: int) -> dict:
+    """Synthetic race data, results and standings with the shapes the scraper stores."""
+    tracks = list(tracks_to_types)
+    rows = {'nascar_calendar': [], 'nascar_race_data': [], 'nascar_race_results': [], 'nascar_standings': []}
+    for season in seasons:
+        points = [0] * drivers
+        for race_number in range(1, races + 1):
+            track_name = tracks[(season + race_number) % len(tracks)]
+            race_date = date(season, 2, 15) + timedelta(weeks=race_number)
+            rows['nascar_calendar'].append({'season_year': season, 'race_number': race_number,
+                                            'track_name': track_name, 'race_date': race_date,
+                                            'season_stage': 'season' if race_number <= 26 else 'playoffs'})
+            rows['nascar_race_data'].append({'season_year': season, 'race_number': race_number,
+                                             'race_name': f'Race {race_number}', 'track_name': track_name,
+                                             'race_date': race_date, 'cautions_number': 5,
+                                             'green_flag_percent': 80.0, 'average_green_flag_run_laps': 30.0,
+                                             'number_of_leaders': 8, 'average_leading_run_laps': 12.0,
+                                             'most_laps_led': 60, 'most_laps_led_driver': 'Driver 1',
+                                             'most_laps_led_percent': 30.0})
+            order = random.sample(range(drivers), drivers)
+            for race_pos, driver in enumerate(order, start=1):
+                race_points = max(41 - race_pos, 1)
+                points[driver] += race_points
+                driver_name = f'Driver {driver + 1}'
+                rows['nascar_race_results'].append({
+                    'season_year': season, 'race_number': race_number, 'driver_name': driver_name,
+                    'car_number': str(driver + 1), 'team_name': 'Team', 'manufacturer': 'Ford',
+                    'race_pos': race_pos, 'quali_pos': race_pos, 'stage_1_pos': 0, 'stage_2_pos': 0,
+                    'stage_3_pos': 0, 'laps_led': 0, 'status': 'running', 'season_points': race_points,
+                    'finish_position_points': race_points, 'stage_points': 0, 'playoff_points': 0})
+                rows['nascar_standings'].append({
+                    'season_year': season, 'race_number': race_number, 'driver_name': driver_name,
+                    'race_season_points': points[driver], 'wins': int(race_pos == 1), 'stage_wins': 0,
+                    'race_playoff_points': 0, 'race_finish_points': race_points, 'race_stage_points': 0})
+    return rows
+
+
+def reader_queries(reader: DBReader, seasons: list, races: int) -> dict:
+    return {
+        'race data': lambda: [reader.get_race_data(season, race) for season in seasons for race in (1, races)],
+        'race results': lambda: [reader.get_race_results(season, races // 2) for season in seasons],
+        'season standings data': lambda: [reader.get_season_standings_data(season, races) for season in seasons],
+        'season standings frame': lambda: [reader.get_season_standings(season) for season in seasons],
+        'calendar': lambda: [reader.get_calendar(season) for season in seasons],
+    }
+
+
+def time_queries(queries: dict, repeat: int) -> dict:
+    timings = {}
+    for name, query in queries.items():
+        query()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        timings[name] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+def secondary_indexes() -> list:
+    return [index for table in metadata.sorted_tables for index in table.indexes]
+
+
+def drop_indexes(writer: DBWriter, indexes: list) -> None:
+    with writer.app.app_context(), writer.db.engine.begin() as connection:
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+        connection.execute(text('ANALYZE'))
+    return
+
+
+def create_indexes(writer: DBWriter, indexes: list) -> None:
+    with writer.app.app_context(), writer.db.engine.begin() as connection:
+        for index in indexes:
+            index.create(connection, checkfirst=True)
+        connection.execute(text('ANALYZE'))
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the DBReader queries with and without the secondary indexes')
+    parser.add_argument('--database', default='data/benchmark.db', help='SQLite file, seeded when it does not exist')
+    parser.add_argument('--seasons', type=int, default=12)
+    parser.add_argument('--races', type=int, default=36)
+    parser.add_argument('--drivers', type=int, default=38)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    seasons = list(range(2025 - args.seasons + 1, 2026))
+    seed = not os.path.exists(args.database)
+    os.makedirs(os.path.dirname(os.path.abspath(args.database)), exist_ok=True)
+    app = Flask(__name__)
+    writer = DBWriter(app, sqlite_url(args.database))
+    reader = DBReader(app)
+    if seed:
+        random.seed(0)
+        writer.fill_tracks_info()
+        writer.insert_rows(seed_rows(seasons, args.races, args.drivers))
+
+    indexes = secondary_indexes()
+    queries = reader_queries(reader, seasons, args.races)
+    drop_indexes(writer, indexes)
+    before = time_queries(queries, args.repeat)
+    create_indexes(writer, indexes)
+    after = time_queries(queries, args.repeat)
+
+    print(f'{len(seasons)} seasons, {args.races} races, {args.drivers} drivers, ms per call over all seasons')
+    print(f'{"query":<24}{"no indexes":>12}{"indexes":>12}')
+    for name in queries:
+        print(f'{name:<24}{before[name]:>12.2f}{after[name]:>12.2f}')
@@ -0,0 +1,73 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from bs4 import BeautifulSoup
+
+import scraper_core
+from db_scrapper import write_race_page
+from scraper_core import SECTION_HEADERS, classify_tables
+from page_cache import PageCache
+from reparse_pages import cached_races
+
+
+def rescan_tables(soup: BeautifulSoup) -> dict:
+    """The per-section lookups scrap_race used to do: one find_all('table') scan per section."""
+    sections = {'results': soup.find('table', class_='tb race-results-tbl')}
+    for section, title in SECTION_HEADERS.items():
+        for table in soup.find_all('table', class_='tb'):
+            if table.find('td', class_='newhead') and title in table.find('td', class_='newhead').text:
+                sections[section] = table
+                break
+    return sections
+
+
+def time_per_page(function, pages: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            function(page)
+    return (time.perf_counter() - start) / (repeat * len(pages)) * 1000
+
+
+def available_parsers() -> list:
+    parsers = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        parsers.append('lxml')
+    except ImportError:
+        pass
+    return parsers
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time race page parsing on pages from the raw page cache')
+    parser.add_argument('--limit', type=int, default=50, help='number of cached race pages to use')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cache = PageCache()
+    pages = [(cache.get(url), race_number) for _, race_number, url in cached_races(cache)[:args.limit]]
+    if not pages:
+        raise SystemExit('No race pages in the cache, run the scraper first')
+
+    soup = [BeautifulSoup(page, 'html.parser') for page, _ in pages]
+    print(f'{len(pages)} race pages, ms per page')
+    print(f'table lookup, rescan per section: {time_per_page(rescan_tables, soup, args.repeat):.2f}')
+    print(f'table lookup, single pass:        {time_per_page(classify_tables, soup, args.repeat):.2f}')
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as work_dir, redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for html_parser in available_parsers():
+                scraper_core.HTML_PARSER = html_parser
+                timings[html_parser] = time_per_page(lambda page: write_race_page(*page), pages, args.repeat)
+        finally:
+            os.chdir(cwd)
+    for html_parser, elapsed in timings.items():
+        print(f'write_race_page, {html_parser}: {elapsed:.2f}')
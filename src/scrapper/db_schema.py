@@ -0,0 +1,97 @@
+from sqlalchemy import Column, Date, Float, Index, Integer, MetaData, String, Table, inspect
+from sqlalchemy.engine import Engine
+
+
+metadata = MetaData()
+
+nascar_track_data = Table(
+    'nascar_track_data', metadata,
+    Column('track_name', String(255), nullable=False, primary_key=True),
+    Column('track_short_name', String(255), nullable=False),
+    Column('track_type', String(255), nullable=False),
+    Column('track_type_short', String(255), nullable=False),
+    Column('track_length_mi', String(255), nullable=True),
+)
+
+nascar_calendar = Table(
+    'nascar_calendar', metadata,
+    Column('season_year', Integer, nullable=False, primary_key=True),
+    Column('race_number', Integer, nullable=False, primary_key=True),
+    Column('track_name', String(255), nullable=False),
+    Column('race_date', Date, nullable=False),
+    Column('season_stage', String(255), nullable=False),
+)
+
+nascar_race_data = Table(
+    'nascar_race_data', metadata,
+    Column('season_year', Integer, nullable=False, primary_key=True),
+    Column('race_number', Integer, nullable=False, primary_key=True),
+    Column('race_name', String(255), nullable=False),
+    Column('track_name', String(255), nullable=False),
+    Column('race_date', Date, nullable=False),
+    Column('cautions_number', Integer, nullable=False),
+    Column('green_flag_percent', Float, nullable=False),
+    Column('average_green_flag_run_laps', Float, nullable=False),
+    Column('number_of_leaders', Integer, nullable=False),
+    Column('average_leading_run_laps', Float, nullable=False),
+    Column('most_laps_led', Integer, nullable=False),
+    Column('most_laps_led_driver', String(255), nullable=False),
+    Column('most_laps_led_percent', Float, nullable=False),
+)
+
+nascar_race_results = Table(
+    'nascar_race_results', metadata,
+    Column('season_year', Integer, nullable=False, primary_key=True),
+    Column('race_number', Integer, nullable=False, primary_key=True),
+    Column('driver_name', String(255), nullable=False, primary_key=True),
+    Column('car_number', String(255), nullable=False),
+    Column('team_name', String(255), nullable=False),
+    Column('manufacturer', String(255), nullable=False),
+    Column('race_pos', Integer, nullable=False),
+    Column('quali_pos', Integer, nullable=False),
+    Column('stage_1_pos', Integer, nullable=False),
+    Column('stage_2_pos', Integer, nullable=False),
+    Column('stage_3_pos', Integer, nullable=False),
+    Column('laps_led', Integer, nullable=False),
+    Column('status', String(255), nullable=False),
+    Column('season_points', Integer, nullable=False),
+    Column('finish_position_points', Integer, nullable=False),
+    Column('stage_points', Integer, nullable=False),
+    Column('playoff_points', Integer, nullable=False),
+)
+
+nascar_standings = Table(
+    'nascar_standings', metadata,
+    Column('season_year', Integer, nullable=False, primary_key=True),
+    Column('race_number', Integer, nullable=False, primary_key=True),
+    Column('driver_name', String(255), nullable=False, primary_key=True),
+    Column('race_season_points', Integer, nullable=False),
+    Column('wins', Integer, nullable=False),
+    Column('stage_wins', Integer, nullable=False),
+    Column('race_playoff_points', Integer, nullable=False),
+    Column('race_finish_points', Integer, nullable=False),
+    Column('race_stage_points', Integer, nullable=False),
+)
+
+# Secondary indexes for the reader's access patterns. Season/race filters and the standings range
+# scan are served by the primary keys, which already lead with (season_year, race_number).
+# Calendar and race data are joined to the tracks on track_name
+Index('ix_nascar_calendar_track_name', nascar_calendar.c.track_name)
+Index('ix_nascar_race_data_track_name', nascar_race_data.c.track_name)
+# Covers the race_pos lookup of the standings reads, so it is answered from the index alone
+Index('ix_nascar_race_results_race_pos', nascar_race_results.c.season_year, nascar_race_results.c.race_number,
+      nascar_race_results.c.driver_name, nascar_race_results.c.race_pos)
+
+
+def migrate(engine: Engine) -> list:
+    """Creates missing tables, then the indexes missing on existing tables. Returns the created index names."""
+    metadata.create_all(engine)
+    created = []
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+    return created
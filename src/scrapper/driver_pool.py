@@ -0,0 +1,100 @@
+import logging
+import queue
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def make_chrome_options() -> Options:
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+
+class ChromeSession:
+    """Headless Chrome kept alive across page loads, restarted after max_pages loads or when it crashes."""
+    def __init__(self, max_pages: int = 50, rate_limiter=None):
+        self.max_pages = max_pages
+        self.rate_limiter = rate_limiter
+        self.driver = None
+        self.pages = 0
+        return
+
+    def get_page(self, url: str) -> str:
+        for attempt in range(2):
+            if self.driver is None or self.pages >= self.max_pages:
+                self._start()
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            try:
+                self.driver.get(url)
+                self.pages += 1
+                return self.driver.page_source
+            except WebDriverException as e:
+                logging.warning(f"Chrome session failed on {url}: {e}")
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+                logging.info("Driver quit successfully")
+            except WebDriverException as e:
+                logging.warning(f"Error quitting driver: {e}")
+            self.driver = None
+        return
+
+    def _start(self) -> None:
+        self.close()
+        self.driver = webdriver.Chrome(options=make_chrome_options())
+        self.pages = 0
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
+
+
+class DriverPool:
+    """A fixed number of sessions handed out one caller at a time. Browsers start on first use."""
+    def __init__(self, size: int = 1, max_pages: int = 50, rate_limiter=None, session_factory=ChromeSession):
+        self.sessions = [session_factory(max_pages, rate_limiter) for _ in range(size)]
+        self.idle = queue.Queue()
+        for session in self.sessions:
+            self.idle.put(session)
+        return
+
+    @contextmanager
+    def session(self):
+        session = self.idle.get()
+        try:
+            yield session
+        finally:
+            self.idle.put(session)
+
+    def close(self) -> None:
+        for session in self.sessions:
+            session.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+
+class PageCache:
+    """
+    Raw pages stored gzip-compressed under their sha256, plus an index of the versions
+    fetched for every URL. Only the newest keep_versions versions of a URL are kept,
+    and prune() also drops versions older than max_age_days.
+    """
+    def __init__(self, root: str = 'data/page_cache', keep_versions: int = 3, max_age_days: int | None = None):
+        self.root = root
+        self.keep_versions = keep_versions
+        self.max_age_days = max_age_days
+        self.index_path = os.path.join(root, 'index.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as file:
+                self.index = json.load(file)
+        self.lock = threading.Lock()
+        return
+
+    def put(self, url: str, page_source: str) -> str:
+        content = page_source.encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f'{path}.{threading.get_ident()}.tmp', 'wb') as file:
+                file.write(gzip.compress(content))
+            os.replace(f'{path}.{threading.get_ident()}.tmp', path)
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            versions = [version for version in self.index.get(url, []) if version['sha256'] != digest]
+            versions.append({'sha256': digest, 'fetched_at': fetched_at})
+            self.index[url] = versions[-self.keep_versions:]
+            if len(versions) > self.keep_versions:
+                self._delete_unreferenced(version['sha256'] for version in versions[:-self.keep_versions])
+            self._save_index()
+        return digest
+
+    def get(self, url: str) -> str | None:
+        versions = self.index.get(url)
+        if not versions:
+            return None
+        with open(self._blob_path(versions[-1]['sha256']), 'rb') as file:
+            return gzip.decompress(file.read()).decode('utf-8')
+
+    def urls(self) -> list:
+        return list(self.index)
+
+    def prune(self) -> None:
+        with self.lock:
+            dropped = []
+            min_fetched_at = None
+            if self.max_age_days is not None:
+                min_fetched_at = (datetime.now() - timedelta(days=self.max_age_days)).isoformat(timespec='seconds')
+            for url, versions in list(self.index.items()):
+                kept = versions[-self.keep_versions:]
+                if min_fetched_at is not None:
+                    kept = [version for version in kept if version['fetched_at'] >= min_fetched_at]
+                dropped += [version['sha256'] for version in versions if version not in kept]
+                if kept:
+                    self.index[url] = kept
+                else:
+                    del self.index[url]
+            self._delete_unreferenced(dropped)
+            self._save_index()
+        return
+
+    def _delete_unreferenced(self, digests) -> None:
+        referenced = {version['sha256'] for versions in self.index.values() for version in versions}
+        for digest in set(digests) - referenced:
+            if os.path.exists(self._blob_path(digest)):
+                os.remove(self._blob_path(digest))
+        return
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'blobs', digest[:2], f'{digest}.html.gz')
+
+    def _save_index(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(f'{self.index_path}.tmp', 'w') as file:
+            json.dump(self.index, file, indent=2, sort_keys=True)
+        os.replace(f'{self.index_path}.tmp', self.index_path)
+        return
@@ -0,0 +1,56 @@
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from driver_pool import USER_AGENT, ChromeSession
+
+
+class PageFetcher:
+    """
+    Fetches pages over pooled keep-alive HTTP connections. A browser is only started when the
+    HTML that comes back is missing one of the required markers, e.g. the class of a results table.
+    """
+    def __init__(self, max_pages: int = 50, rate_limiter=None, timeout: float = 30, pool_size: int = 4, cache=None):
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self.browser = ChromeSession(max_pages, rate_limiter)
+        return
+
+    def get_page(self, url: str, required: tuple = ()) -> str:
+        page_source = self._fetch(url, required)
+        if self.cache is not None:
+            self.cache.put(url, page_source)
+        return page_source
+
+    def _fetch(self, url: str, required: tuple) -> str:
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            response = self.http.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            missing = [marker for marker in required if marker not in response.text]
+            if not missing:
+                return response.text
+            logging.info(f"{url} came back without {missing}, loading it in the browser")
+        except requests.RequestException as e:
+            logging.warning(f"HTTP fetch of {url} failed, loading it in the browser: {e}")
+        return self.browser.get_page(url)
+
+    def close(self) -> None:
+        self.http.close()
+        self.browser.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+sys.path.append('../backend')
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from file_parsers import parse_race
+from race_store import RaceStore, store_tables
+
+
+def race_folders(data_path: str = 'data') -> list:
+    """(season, race_number) of every scraped race folder under data_path, in race order."""
+    races = []
+    for season in os.listdir(data_path):
+        season_path = os.path.join(data_path, season)
+        if not season.isdigit() or not os.path.isdir(season_path):
+            continue
+        for race_number in os.listdir(season_path):
+            if race_number.isdigit() and os.path.exists(os.path.join(season_path, race_number, 'race_results.csv')):
+                races.append((int(season), int(race_number)))
+    return sorted(races)
+
+
+def parse_race_folder(race: tuple, data_path: str = 'data') -> tuple:
+    season, race_number = race
+    return season, race_number, parse_race(season, race_number, data_path)
+
+
+def reingest_races(data_path: str = 'data', store_path: str = '../backend/data', workers: int = 1,
+                   rebuild: bool = False) -> int:
+    """
+    Parses every race folder and writes it to the race store. Races are parsed on `workers`
+    processes and written in race order. Without rebuild, races already in the store are skipped,
+    with rebuild the four tables are replaced by what the folders contain.
+    """
+    race_store = RaceStore(store_path)
+    races = [race for race in race_folders(data_path) if rebuild or not race_store.has_race('race_data', *race)]
+    collected = {table: [] for table in store_tables}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for season, race_number, tables in executor.map(parse_race_folder, races, [data_path] * len(races),
+                                                        chunksize=8):
+            for table, data in tables.items():
+                if rebuild:
+                    collected[table].append(pd.DataFrame(data))
+                else:
+                    race_store.append_race(table, season, race_number, data)
+    if rebuild and races:
+        for table, frames in collected.items():
+            columns = race_store.manifest.get(table, {}).get('columns')
+            race_store.import_table(table, pd.concat(frames, ignore_index=True).reindex(columns=columns))
+    return len(races)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Re-ingest scraped race folders into the race store')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--rebuild', action='store_true', help='replace the stored tables instead of adding missing races')
+    args = parser.parse_args()
+    print(f'Ingested {reingest_races(workers=args.workers, rebuild=args.rebuild)} races')
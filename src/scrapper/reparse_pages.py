@@ -0,0 +1,48 @@
+import argparse
+import re
+import time
+
+from db_scrapper import write_race_page, write_loop_page
+from page_cache import PageCache
+
+
+race_url_pattern = re.compile(r'/race/(\d{4})-(\d+)/W$')
+
+
+def cached_races(cache: PageCache, seasons: list | None = None) -> list:
+    """Returns (season, race_number, race page url) for every race page in the cache."""
+    races = []
+    for url in cache.urls():
+        match = race_url_pattern.search(url)
+        if match and (seasons is None or int(match.group(1)) in seasons):
+            races.append((int(match.group(1)), int(match.group(2)), url))
+    return sorted(races)
+
+
+def reparse_cached_races(cache: PageCache, seasons: list | None = None) -> int:
+    """Rewrites the CSVs under data/{season}/{race} from cached pages only. Returns the number of races written."""
+    written = 0
+    for season, race_number, url in cached_races(cache, seasons):
+        folder_name = write_race_page(cache.get(url), race_number)
+        if folder_name is None:
+            continue
+        loop_source = cache.get(url.replace('/race/', '/loopdata/'))
+        if loop_source is not None:
+            write_loop_page(loop_source, folder_name)
+        written += 1
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Regenerate race CSVs from the raw page cache')
+    parser.add_argument('--seasons', type=int, nargs='*', help='seasons to re-parse, all cached seasons by default')
+    parser.add_argument('--prune', action='store_true', help='apply the cache retention policy first')
+    parser.add_argument('--max-age-days', type=int, default=None)
+    args = parser.parse_args()
+
+    cache = PageCache(max_age_days=args.max_age_days)
+    if args.prune:
+        cache.prune()
+    start = time.time()
+    written = reparse_cached_races(cache, args.seasons)
+    print(f'Re-parsed {written} races in {time.time() - start:.1f}s')
@@ -1,45 +1,61 @@
-import pandas as pd
+import sys
+sys.path.append('../backend')
 from datetime import datetime
 
-from db_scrapper import scrap_race
-from file_parsers import NascarRaceDataParser, NascarResultsParser
+from file_parsers import parse_race
 
-from pathlib import Path
+from race_store import RaceStore
+from page_cache import PageCache
+from scrape_ledger import ScrapeLedger
+from scrape_scheduler import ScrapeScheduler
+
+
+race_store = RaceStore('../backend/data')
 
 
 def get_available_races():
-    df = pd.read_csv('../backend/data/race_data.csv')
-    loaded_races = []
-    for season, race_number in df[['season_year', 'race_number']].drop_duplicates().values:
-        loaded_races.append((season, race_number))
-    return loaded_races
+    return race_store.races('race_data')
 
 
 def make_csv_from_res(data, season, race_number, name):
-    path = Path(f'../backend/data/{name}.csv')
-    if path.exists():
-        df = pd.read_csv(f'../backend/data/{name}.csv')
-        season_data = df[df['season_year'] == season]
-        if race_number not in season_data['race_number'].values:
-            df = pd.concat([df, pd.DataFrame(data)])
-            df.to_csv(f'../backend/data/{name}.csv', index=False)
-    else:
-        pd.DataFrame(data).to_csv(f'../backend/data/{name}.csv', index=False)
+    race_store.append_race(name, season, race_number, data)
+    return
+
+def store_race(season, race_number):
+    for name, data in parse_race(season, race_number).items():
+        make_csv_from_res(data, season, race_number, name)
     return
 
-def run_scrapping(start_year=2022):
+
+def store_scraped_race(ledger, season, race_number, result):
+    print(season, race_number)
+    if isinstance(result, Exception):
+        ledger.record(season, race_number, 'failed', repr(result))
+        raise result
+    if not result:
+        ledger.record(season, race_number, 'unavailable')
+        return False
+    try:
+        store_race(season, race_number)
+    except Exception as error:
+        ledger.record(season, race_number, 'failed', repr(error))
+        raise
+    ledger.record(season, race_number, 'success')
+    return True
+
+
+def run_scrapping(start_year=2022, workers=1, requests_per_second=1.0):
     current_year = datetime.now().year
-    for season in range(start_year, current_year + 1):
-        for race_number in range(1, 37):
-            if (season, race_number) not in get_available_races():
-                print(season, race_number)
-                is_success = scrap_race(season, race_number)
-                if not is_success:
+    ledger = ScrapeLedger(completed=get_available_races())
+    with ScrapeScheduler(workers, requests_per_second, cache=PageCache()) as scheduler:
+        for season in range(start_year, current_year + 1):
+            pending = [race_number for race_number in range(1, 37) if not ledger.is_done(season, race_number)]
+            # Races are scraped `workers` at a time and stored in order, so a season stops
+            # at its first unavailable race with at most one window of wasted page loads
+            for window_start in range(0, len(pending), workers):
+                window = pending[window_start:window_start + workers]
+                results = scheduler.scrape([(season, race_number) for race_number in window])
+                if not all(store_scraped_race(ledger, season, race_number, results[(season, race_number)])
+                           for race_number in window):
                     break
-                _, csv_race_data = NascarRaceDataParser(season, race_number).fill_race_data()
-                _, _, csv_res, csv_standings = NascarResultsParser(season, race_number).fill_results_data()
-                make_csv_from_res(csv_res, season, race_number, 'race_results')
-                make_csv_from_res(csv_standings, season, race_number, 'standings')
-                make_csv_from_res(csv_race_data, season, race_number, 'race_data')
-                loop_data = NascarResultsParser(season, race_number).fill_loop_data()
-                make_csv_from_res(loop_data, season, race_number, 'loop_data')
+    return
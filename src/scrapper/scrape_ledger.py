@@ -0,0 +1,39 @@
+import json
+import os
+from datetime import datetime
+
+
+class ScrapeLedger:
+    """Index of scrape attempts per (season, race), kept in memory and saved after every update."""
+    def __init__(self, path: str = 'data/scrape_ledger.json', completed: set = ()):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                self.entries = json.load(file)
+        for season, race_number in completed:
+            entry = self.entries.setdefault(self._key(season, race_number), {'last_attempt': None})
+            entry['status'] = 'success'
+        return
+
+    def is_done(self, season: int, race_number: int) -> bool:
+        return self.entries.get(self._key(season, race_number), {}).get('status') == 'success'
+
+    def record(self, season: int, race_number: int, status: str, error: str | None = None) -> None:
+        self.entries[self._key(season, race_number)] = {
+            'status': status,
+            'last_attempt': datetime.now().isoformat(timespec='seconds'),
+            'error': error,
+        }
+        self._save()
+        return
+
+    def _key(self, season: int, race_number: int) -> str:
+        return f'{int(season)}-{int(race_number)}'
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(f'{self.path}.tmp', 'w') as file:
+            json.dump(self.entries, file, indent=2, sort_keys=True)
+        os.replace(f'{self.path}.tmp', self.path)
+        return
@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+from db_scrapper import scrap_race
+from driver_pool import DriverPool
+from page_fetcher import PageFetcher
+
+
+class HostRateLimiter:
+    """Spaces out page loads per host so that all workers together stay under requests_per_second."""
+    def __init__(self, requests_per_second: float = 1.0):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+        return
+
+    def wait(self, url: str) -> None:
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return
+
+
+class ScrapeScheduler:
+    """Runs scrap_race for several races at once on a bounded pool of page fetchers, retrying failed races."""
+    def __init__(self, workers: int = 4, requests_per_second: float = 1.0, retries: int = 3,
+                 backoff: float = 5.0, max_pages: int = 50, cache=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = DriverPool(workers, max_pages, HostRateLimiter(requests_per_second), partial(PageFetcher, cache=cache))
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        return
+
+    def scrape(self, races: list) -> dict:
+        """Returns {(season, race_number): result of scrap_race, or the exception of the last attempt}."""
+        futures = {(season, race_number): self.executor.submit(self._scrape_race, season, race_number)
+                   for season, race_number in races}
+        results = {}
+        for race, future in futures.items():
+            try:
+                results[race] = future.result()
+            except Exception as error:
+                results[race] = error
+        return results
+
+    def _scrape_race(self, season: int, race_number: int) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                with self.pool.session() as session:
+                    return scrap_race(season, race_number, session)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logging.warning(f"Scraping {season}-{race_number} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        self.pool.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
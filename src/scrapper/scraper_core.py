@@ -0,0 +1,219 @@
+import csv
+import logging
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+from driver_pool import ChromeSession, DriverPool
+from page_cache import PageCache
+from page_fetcher import PageFetcher
+
+# 'lxml' parses several times faster when it is installed
+HTML_PARSER = os.environ.get('SCRAPER_HTML_PARSER', 'html.parser')
+
+SECTION_HEADERS = {
+    'caution_flags': 'Caution flag breakdown',
+    'lap_leaders': 'Lap leader breakdown:',
+    'points_standings': 'Points Standings after this race:',
+    'playoff_standings': 'Playoff standings after this race:',
+}
+RESULTS_HEADERS = ["Pos", "St", "#", "Driver", "Sponsor / Owner", "Car", "Laps", "Status", "Led", "Pts", "PPts"]
+CAUTION_HEADERS = ["Condition", "From Lap", "To Lap", "# Of Laps", "Reason", "Free Pass"]
+TABLE_HEADERS = {
+    'lap_leaders': ['Leader', 'From Lap', 'To Lap', '# Of Laps'],
+    'points_standings': ['Rank', 'Driver', 'Points', 'Diff'],
+    'playoff_standings': ['Rank', 'Driver', 'Wins', 'Points'],
+}
+LOOP_DATA_HEADERS = ["driver_name",
+                     "start_pos",
+                     "mid_race_pos",
+                     "finish_pos",
+                     "highest_pos",
+                     "lowest_pos",
+                     "avg_pos",
+                     "pass_diff",
+                     "green_flag_passes",
+                     "green_flag_times_passed",
+                     "quality_passes",
+                     "pct_quality_passes",
+                     "fastest_lap",
+                     "top_15_laps",
+                     "pct_top_15_laps",
+                     "laps_led",
+                     "pct_laps_led",
+                     "total_laps",
+                     "driver_rating"]
+
+
+def parse_page(page_source: str) -> BeautifulSoup:
+    return BeautifulSoup(page_source, HTML_PARSER)
+
+
+def cell_text(cell) -> str:
+    return re.sub(r'\xa0', ' ', cell.text.strip())
+
+
+def extract_race_name(soup: BeautifulSoup) -> str:
+    try:
+        return soup.find(class_='raceMetaInfo').find('h1').text.strip()
+    except AttributeError as e:
+        logging.error(f"Error extracting race information: {e}")
+        raise
+
+
+def extract_date_location(soup: BeautifulSoup) -> tuple:
+    date = ""
+    location = ""
+    for b_tag in soup.find_all('b'):
+        if 'race number' in b_tag.text:
+            date_tag = b_tag.find_next('a')
+            if date_tag:
+                date = date_tag.text.strip()
+                location_tag = date_tag.find_next('a')
+                if location_tag:
+                    location = location_tag.text.strip()
+                    location_sibling = location_tag.next_sibling
+                    if location_sibling:
+                        location += location_sibling.strip()
+            break
+    return date, location
+
+
+def classify_tables(soup: BeautifulSoup) -> dict:
+    """Walks the tb tables once and keeps the first table of every section, plus the results table under 'results'."""
+    sections = {}
+    for table in soup.find_all('table', class_='tb'):
+        if 'results' not in sections and ' '.join(table.get('class', [])) == 'tb race-results-tbl':
+            sections['results'] = table
+        header = table.find('td', class_='newhead')
+        if header is None:
+            continue
+        header_text = header.text
+        for section, title in SECTION_HEADERS.items():
+            if section not in sections and title in header_text:
+                sections[section] = table
+    return sections
+
+
+def make_race_folder(folder_name: str) -> None:
+    try:
+        os.makedirs(folder_name, exist_ok=True)
+    except OSError as e:
+        logging.error(f"Error creating directory: {e}")
+        raise
+    return
+
+
+def write_race_info(path: str, name_of_the_race: str, date: str, location: str) -> None:
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(['Name of the race', 'Date', 'Location'])
+            csv_writer.writerow([name_of_the_race, date, location])
+    except IOError as e:
+        logging.error(f"Error saving race info: {e}")
+        raise
+    return
+
+
+def write_results(folder_name: str, results_table, min_rows: int = 0) -> bool:
+    """Writes race_results.csv. Returns False when the table has fewer than min_rows rows, i.e. the race is not run yet."""
+    try:
+        if results_table:
+            with open(os.path.join(folder_name, "race_results.csv"), mode='w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(RESULTS_HEADERS)
+                rows = results_table.find_all('tr')[1:]
+                if len(rows) < min_rows:
+                    return False
+                for row in rows:
+                    writer.writerow([cell_text(cell) for cell in row.find_all('td')])
+        else:
+            logging.warning("Race results table not found")
+    except Exception as e:
+        logging.error(f"Error extracting or saving race results: {e}")
+    return True
+
+
+def write_race_sections(folder_name: str, soup: BeautifulSoup, sections: dict, stages: int = 3) -> None:
+    """Writes top_10s.csv for the first `stages` stages and the caution, lap leader and standings tables."""
+    try:
+        write_top_10s(os.path.join(folder_name, 'top_10s.csv'), soup, stages)
+    except Exception as e:
+        logging.error(f"Error extracting or saving top 10 stage info: {e}")
+
+    try:
+        if sections.get('caution_flags'):
+            write_cautions(os.path.join(folder_name, 'caution_flags.csv'), sections['caution_flags'])
+        else:
+            logging.warning("Caution flag table not found")
+    except Exception as e:
+        logging.error(f"Error extracting or saving caution flag info: {e}")
+
+    for section, headers in TABLE_HEADERS.items():
+        try:
+            if section in sections:
+                write_table_csv(os.path.join(folder_name, f'{section}.csv'), headers, sections[section])
+        except Exception as e:
+            logging.error(f"Error extracting or saving {section.replace('_', ' ')} info: {e}")
+    return
+
+
+def write_top_10s(path: str, soup: BeautifulSoup, stages: int) -> None:
+    stage_info = []
+    for stage in range(1, stages + 1):
+        top_10 = soup.find('b', string=f'Top 10 in Stage {stage}:')
+        if top_10:
+            stage_info.append(top_10.next_sibling.strip().split(', '))
+        else:
+            logging.warning(f"Top 10 in Stage {stage} not found")
+            stage_info.append([])
+
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow([f'Top 10 in Stage {stage}:' for stage in range(1, stages + 1)])
+        for i in range(max(len(info) for info in stage_info)):
+            csv_writer.writerow([info[i] if i < len(info) else '' for info in stage_info])
+    return
+
+
+def write_cautions(path: str, caution_table) -> None:
+    with open(path, mode='w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CAUTION_HEADERS)
+        for row in caution_table.find_all('tr')[2:]:
+            row_data = []
+            for cell in row.find_all('td'):
+                img = cell.find('img')
+                if img:
+                    row_data.append(img['src'].split('/')[-1].split('.')[0])
+                else:
+                    row_data.append(cell_text(cell))
+            writer.writerow(row_data)
+    return
+
+
+def write_table_csv(path: str, headers: list, table) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(headers)
+        for row in table.find_all('tr')[2:]:
+            csv_writer.writerow([cell.text.strip() for cell in row.find_all('td')])
+    return
+
+
+def write_loop_data(path: str, soup: BeautifulSoup) -> None:
+    try:
+        results_table = soup.find('table', class_='tb loopData')
+        if results_table:
+            with open(path, mode='w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(LOOP_DATA_HEADERS)
+                for row in results_table.find_all('tr')[3:]:
+                    writer.writerow([cell_text(cell) for cell in row.find_all('td')])
+        else:
+            logging.warning("Race results table not found")
+    except Exception as e:
+        logging.error(f"Error extracting or saving race results: {e}")
+    return